@@ -0,0 +1,147 @@
+"""Request throughput of the service with inline vs. queued logging.
+
+Starts `python -m app.server` once with records formatted and written on the
+request path (`LOG_QUEUE_ENABLED=false`) and once with the background log
+queue, and drives `/health`, which logs one INFO record per request, with
+concurrent keep-alive requests for a fixed duration. The server's stderr is a
+pipe drained into a file, optionally throttled with `--sink-kbps` to mimic a
+slow log collector. Reports req/s, latency percentiles and the share of the
+requests' log records that were written (the rest were dropped by a full
+queue).
+
+Usage:
+    python scripts/benchmark_logging.py --duration 10
+    python scripts/benchmark_logging.py --duration 10 --sink-kbps 100
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmark_workers import ROOT, wait_until_ready
+
+HEALTH_LOG_MESSAGE = "Health check endpoint was called."
+
+
+def start_server(workers: int, port: int, queued: bool) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.path.join(ROOT, "src"),
+        "SERVER_WORKERS": str(workers),
+        "SERVER_PORT": str(port),
+        "SERVER_HOST": "127.0.0.1",
+        "LOG_QUEUE_ENABLED": str(queued).lower(),
+        "EVENT_LOOP_LAG_MONITOR_ENABLED": "false",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+
+def drain(pipe, log_file, kbps: float) -> None:
+    """Copy the server's log output to `log_file`, at most `kbps` KiB/s."""
+    while chunk := pipe.read1(4096):
+        log_file.write(chunk)
+        if kbps:
+            time.sleep(len(chunk) / (kbps * 1024))
+
+
+async def drive(
+    host: str, port: int, path: str, concurrency: int, duration: float
+) -> list[float]:
+    """Send keep-alive requests from `concurrency` connections for `duration`.
+
+    Uses raw HTTP/1.1 over asyncio streams: the load generator shares the
+    machine with the server, and a full HTTP client would dominate the CPU.
+    """
+    latencies: list[float] = []
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    deadline = time.monotonic() + duration
+
+    async def connection():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                writer.write(request)
+                head = await reader.readuntil(b"\r\n\r\n")
+                status = int(head.split(b" ", 2)[1])
+                if status != 200:
+                    raise RuntimeError(f"{path} returned {status}")
+                length = re.search(rb"(?i)content-length: *(\d+)", head)
+                await reader.readexactly(int(length.group(1)) if length else 0)
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return latencies
+
+
+def count_health_records(path: str) -> int:
+    with open(path, encoding="utf-8", errors="replace") as log_file:
+        return sum(HEALTH_LOG_MESSAGE in line for line in log_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument(
+        "--sink-kbps", type=float, default=0, help="Log sink bandwidth (0: no limit)"
+    )
+    args = parser.parse_args()
+
+    host, path = "127.0.0.1", "/health"
+    log_dir = tempfile.mkdtemp(prefix="deep-agent-bench-logs-")
+
+    print(f"{'mode':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'logged':>8}")
+    for mode, queued in (("inline", False), ("queued", True)):
+        log_path = os.path.join(log_dir, f"{mode}.log")
+        with open(log_path, "wb") as log_file:
+            server = start_server(args.workers, args.port, queued)
+            sink = threading.Thread(
+                target=drain, args=(server.stderr, log_file, args.sink_kbps)
+            )
+            sink.start()
+            try:
+                asyncio.run(wait_until_ready(f"http://{host}:{args.port}"))
+                # Warm up every worker before measuring
+                warmup = len(
+                    asyncio.run(drive(host, args.port, path, args.concurrency, 1.0))
+                )
+                latencies = sorted(
+                    asyncio.run(
+                        drive(host, args.port, path, args.concurrency, args.duration)
+                    )
+                )
+            finally:
+                # Workers flush queued records on a graceful shutdown
+                server.terminate()
+                server.wait()
+                sink.join()
+        requests = warmup + len(latencies)
+        # wait_until_ready's successful probe logs one record too
+        logged = count_health_records(log_path) - 1
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        throughput = len(latencies) / args.duration
+        print(
+            f"{mode:>7} {throughput:>9.1f} {p50:>8.1f} {p99:>8.1f} "
+            f"{logged / requests:>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Throughput of the service by uvicorn worker count.
+
+Starts `python -m app.server` once per worker count and drives it with
+concurrent keep-alive requests for a fixed duration. The default target is a
+gzip-compressed `/api/v1/files/{hash}` download of a large stored file, which
+is CPU-bound per request like response serialization, so it shows how the
+service scales across processes (a trivial endpoint like `/health` mostly
+measures the load generator).
+
+Usage:
+    python scripts/benchmark_workers.py --workers 1 2 4 --duration 10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+# The benchmark never calls the LLM or search APIs, but settings require keys
+for key in ("TAVILY_API_KEY", "ANTHROPIC_API_KEY", "OPENAI_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+
+def store_payload(store_path: str, size_kb: int) -> str:
+    """Write a pseudo-random markdown document to the file store."""
+    from app.services.file_store import FileStore
+
+    rng = random.Random(0)
+    words = [
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 9)))
+        for _ in range(2000)
+    ]
+    content = ""
+    while len(content) < size_kb * 1024:
+        content += " ".join(rng.choices(words, k=20)) + "\n"
+    return FileStore(store_path).put(content)
+
+
+def start_server(workers: int, port: int, store_path: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.path.join(ROOT, "src"),
+        "SERVER_WORKERS": str(workers),
+        "SERVER_PORT": str(port),
+        "SERVER_HOST": "127.0.0.1",
+        "FILE_STORE_PATH": store_path,
+        "EVENT_LOOP_LAG_MONITOR_ENABLED": "false",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.server"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_ready(base_url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+
+async def drive(url: str, concurrency: int, duration: float) -> list[float]:
+    """Send requests from `concurrency` loops until `duration` has elapsed."""
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=concurrency)
+    headers = {"Accept-Encoding": "gzip"}
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        deadline = time.monotonic() + duration
+
+        async def loop():
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--size-kb", type=int, default=256)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", help="Request path (default: stored file)")
+    args = parser.parse_args()
+
+    store_path = tempfile.mkdtemp(prefix="deep-agent-bench-")
+    path = args.path or f"/api/v1/files/{store_payload(store_path, args.size_kb)}"
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for workers in args.workers:
+        server = start_server(workers, args.port, store_path)
+        try:
+            asyncio.run(wait_until_ready(base_url))
+            # Warm up every worker's imports and caches
+            asyncio.run(drive(base_url + path, args.concurrency, 1.0))
+            latencies = sorted(
+                asyncio.run(drive(base_url + path, args.concurrency, args.duration))
+            )
+        finally:
+            server.terminate()
+            server.wait()
+        p50 = latencies[len(latencies) // 2] * 1000
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000
+        throughput = len(latencies) / args.duration
+        print(f"{workers:>7} {throughput:>9.1f} {p50:>8.1f} {p99:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
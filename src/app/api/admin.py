@@ -0,0 +1,175 @@
+import asyncio
+import os
+import re
+import secrets
+import tempfile
+import threading
+import uuid
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.services.profiling import Profile
+
+router = APIRouter()
+
+# Only one profile runs at a time; sampling every thread is not free
+_profile_lock = threading.Lock()
+
+# Per-request profiles are stored on disk so that any worker can serve them;
+# only the most recent ones are kept
+MAX_STORED_PROFILES = 20
+_PROFILE_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+def is_admin_token(token: str | None) -> bool:
+    """
+    Checks a token against the configured admin token.
+    Admin access is disabled when no token is configured.
+    """
+    if not settings.ADMIN_TOKEN or token is None:
+        return False
+    return secrets.compare_digest(token, settings.ADMIN_TOKEN)
+
+
+def save_request_profile(profile_id: str, profile: str) -> None:
+    """
+    Writes a request profile to the profile directory and deletes the oldest
+    profiles beyond MAX_STORED_PROFILES.
+    """
+    os.makedirs(settings.PROFILE_STORE_PATH, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=settings.PROFILE_STORE_PATH, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+        tmp.write(profile)
+    os.replace(tmp_path, os.path.join(settings.PROFILE_STORE_PATH, profile_id))
+
+    entries = [
+        entry
+        for entry in os.scandir(settings.PROFILE_STORE_PATH)
+        if _PROFILE_ID_RE.match(entry.name)
+    ]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[MAX_STORED_PROFILES:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            continue
+
+
+def load_request_profile(profile_id: str) -> str | None:
+    """
+    Reads a stored request profile, or returns None if it does not exist.
+    """
+    if not _PROFILE_ID_RE.match(profile_id):
+        return None
+    try:
+        with open(
+            os.path.join(settings.PROFILE_STORE_PATH, profile_id), encoding="utf-8"
+        ) as profile:
+            return profile.read()
+    except FileNotFoundError:
+        return None
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)):
+    """
+    Dependency that rejects requests without a valid `X-Admin-Token` header.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.get(
+    "/profile",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_admin)],
+    tags=["Admin"],
+)
+async def profile_worker(
+    seconds: float = Query(default=10.0, gt=0, le=120),
+    interval_ms: float = Query(default=10.0, ge=1, le=1000),
+    memory: bool = Query(default=False),
+):
+    """
+    Samples the CPU stacks of every thread in this worker for `seconds` and
+    returns them as collapsed stacks (flamegraph.pl / speedscope compatible).
+    With `memory=true`, the top tracemalloc allocation sites are appended.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        async with Profile(interval=interval_ms / 1000, trace_memory=memory) as profile:
+            await asyncio.sleep(seconds)
+    finally:
+        _profile_lock.release()
+    return await asyncio.to_thread(profile.render)
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(require_admin)],
+    tags=["Admin"],
+)
+async def get_request_profile(profile_id: str):
+    """
+    Returns the profile captured for a request tagged with `X-Profile-Request`,
+    from whichever worker handled that request.
+    """
+    profile = await asyncio.to_thread(load_request_profile, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+class RequestProfilingMiddleware:
+    """
+    ASGI middleware that profiles a single request, including the full body of
+    streaming responses, when it carries `X-Profile-Request: cpu` (or
+    `cpu+memory`) and a valid `X-Admin-Token`. The profile id is returned in
+    the `X-Profile-Id` response header and the profile is served by
+    `/admin/profiles/{profile_id}`.
+
+    The sampler sees every thread of the worker, so the profile also contains
+    whatever else the worker ran concurrently (other requests, the event loop
+    serving them); profile on an otherwise idle worker for a clean picture.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        mode = headers.get(b"x-profile-request", b"").decode()
+        token = headers.get(b"x-admin-token", b"").decode() or None
+        if mode not in ("cpu", "cpu+memory") or not is_admin_token(token):
+            return await self.app(scope, receive, send)
+        if not _profile_lock.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"x-profile-id", profile_id.encode()),
+                    ],
+                }
+            await send(message)
+
+        try:
+            async with Profile(trace_memory=mode == "cpu+memory") as profile:
+                await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _profile_lock.release()
+        await asyncio.to_thread(
+            lambda: save_request_profile(profile_id, profile.render())
+        )
@@ -16,6 +16,22 @@ class InvokeRequest(BaseModel):
     messages: List[APIBaseMessage]
     files: Optional[Dict[str, str]] = Field(default_factory=dict)
     todos: Optional[List[Dict[str, Any]]] = Field(default_factory=list)
+    file_refs: Optional[Dict[str, str]] = Field(
+        default_factory=dict,
+        description="Files the server already holds, as a mapping of file name to content hash.",
+    )
+    files_mode: Literal["inline", "manifest"] = Field(
+        default="inline",
+        description="Return file contents inline, or only a manifest of file hashes.",
+    )
+
+
+class FileManifestEntry(BaseModel):
+    """A file returned by reference; fetch its body from `/files/{sha256}`."""
+
+    name: str
+    size: int
+    sha256: str
 
 
 class InvokeResponse(BaseModel):
@@ -24,3 +40,19 @@ class InvokeResponse(BaseModel):
     messages: List[APIBaseMessage]
     files: Dict[str, str]
     todos: List[Dict[str, Any]]
+    file_manifest: Optional[List[FileManifestEntry]] = None
+
+
+class BatchInvokeRequest(BaseModel):
+    """Request model for the batch invocation endpoint."""
+
+    requests: List[InvokeRequest] = Field(min_length=1)
+    max_concurrency: Optional[int] = Field(default=None, ge=1)
+
+
+class BatchItemResult(BaseModel):
+    """A single NDJSON line emitted by the batch invocation endpoint."""
+
+    index: int
+    response: Optional[InvokeResponse] = None
+    error: Optional[str] = None
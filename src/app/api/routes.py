@@ -1,13 +1,32 @@
+import asyncio
+import gzip
 import json
+import logging
 import uuid
 from typing import Any, get_args
 
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from langchain_core.messages import BaseMessage
 
-from app.api.models import APIBaseMessage, InvokeRequest, InvokeResponse
+from app.api.models import (
+    APIBaseMessage,
+    BatchInvokeRequest,
+    BatchItemResult,
+    FileManifestEntry,
+    InvokeRequest,
+    InvokeResponse,
+)
+from app.config import settings
 from app.services.agent_service import agent_executor
+from app.services.cancellation import (
+    CancellationCallbackHandler,
+    open_cancellation_scope,
+)
+from app.services.file_store import file_store
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -48,53 +67,258 @@ def convert_event_data_to_json_serializable(data: Any) -> Any:
         return str(data)
 
 
-async def stream_generator(request: InvokeRequest):
+def resolve_file_refs(file_refs: dict[str, str]) -> dict[str, str]:
     """
-    Generator function that streams agent events.
+    Loads the contents of files referenced by hash from the file store.
+    Raises a 422 error listing every hash the server does not hold.
+    """
+    files = {}
+    missing = []
+    for name, sha256 in file_refs.items():
+        content = file_store.get(sha256)
+        if content is None:
+            missing.append(sha256)
+        else:
+            files[name] = content
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": "Unknown file hashes; send these files inline instead.",
+                "missing_hashes": missing,
+            },
+        )
+    return files
+
+
+def build_agent_input(request: InvokeRequest) -> dict:
+    """
+    Converts an API request into the initial agent state.
     """
     messages = [(msg.role, msg.content) for msg in request.messages]
-    agent_input = {
+    files = dict(request.files or {})
+    if request.file_refs:
+        files.update(resolve_file_refs(request.file_refs))
+        metrics.increment("file_transfer.refs_resolved", len(request.file_refs))
+    return {
         "messages": messages,
-        "files": request.files,
+        "files": files,
         "todos": request.todos,
     }
-    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
-
-    async for event in agent_executor.astream_events(
-        agent_input, config=config, version="v1"
-    ):
-        # This check is important to filter out internal heartbeat events if any
-        if event["event"] != "ping":
-            serializable_data = convert_event_data_to_json_serializable(event["data"])
-            yield f"event: {event['event']}\ndata: {json.dumps(serializable_data)}\n\n"
 
 
-@router.post("/stream", tags=["Agent"])
-async def stream_agent(request: InvokeRequest):
+def store_file_manifest(files: dict[str, str]) -> list[FileManifestEntry]:
     """
-    Invoke the Deep Agent and stream back events as they happen.
+    Stores file bodies by content hash and returns their manifest.
     """
-    return StreamingResponse(stream_generator(request), media_type="text/event-stream")
+    manifest = []
+    for name, content in files.items():
+        sha256 = file_store.put(content)
+        manifest.append(
+            FileManifestEntry(
+                name=name, size=len(content.encode("utf-8")), sha256=sha256
+            )
+        )
+    return manifest
 
 
-@router.post("/invoke", response_model=InvokeResponse, tags=["Agent"])
-async def invoke_agent(request: InvokeRequest) -> InvokeResponse:
-    messages = [(msg.role, msg.content) for msg in request.messages]
-    agent_input = {
-        "messages": messages,
-        "files": request.files,
-        "todos": request.todos,
-    }
-    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
-    final_state = await agent_executor.ainvoke(agent_input, config=config)
+async def build_invoke_response(
+    final_state: dict, files_mode: str = "inline"
+) -> InvokeResponse:
+    """
+    Converts a final agent state into the API response model.
+    In manifest mode, file bodies are stored and only their hashes are returned.
+    """
     response_messages = [
         APIBaseMessage(
             role=msg.type if msg.type != "ai" else "assistant", content=msg.content
         )
         for msg in final_state["messages"]
     ]
+    files = final_state.get("files", {})
+    if files_mode == "manifest":
+        manifest = await asyncio.to_thread(store_file_manifest, files)
+        metrics.increment("file_transfer.manifest_responses")
+        return InvokeResponse(
+            messages=response_messages,
+            files={},
+            todos=final_state.get("todos", []),
+            file_manifest=manifest,
+        )
     return InvokeResponse(
         messages=response_messages,
-        files=final_state.get("files", {}),
+        files=files,
         todos=final_state.get("todos", []),
     )
+
+
+def get_subagent_info(event: dict) -> dict | None:
+    """
+    Returns the sub-agent name and task id for events emitted inside a `task`
+    delegation, or None for events of the main agent.
+    """
+    metadata = event.get("metadata") or {}
+    if "subagent_name" not in metadata:
+        return None
+    return {"name": metadata["subagent_name"], "task_id": metadata.get("task_id")}
+
+
+async def stream_generator(agent_input: dict):
+    """
+    Generator function that streams agent events.
+
+    When the client disconnects, the response task cancels this generator (or
+    closes it, if it was paused at `yield`). The run's cancellation event is
+    then set so that sub-agents, fetches and LLM calls still running in worker
+    threads stop at their next checkpoint.
+    """
+    cancel_event = open_cancellation_scope()
+    thread_id = str(uuid.uuid4())
+    config = {
+        "configurable": {"thread_id": thread_id},
+        "callbacks": [CancellationCallbackHandler(cancel_event)],
+    }
+
+    try:
+        async for event in agent_executor.astream_events(
+            agent_input, config=config, version="v1"
+        ):
+            # This check is important to filter out internal heartbeat events if any
+            if event["event"] != "ping":
+                serializable_data = convert_event_data_to_json_serializable(
+                    event["data"]
+                )
+                # Tag sub-agent events so clients can show delegated progress
+                subagent = get_subagent_info(event)
+                if subagent is not None:
+                    serializable_data = {**serializable_data, "subagent": subagent}
+                yield f"event: {event['event']}\ndata: {json.dumps(serializable_data)}\n\n"
+    except (asyncio.CancelledError, GeneratorExit):
+        # A disconnect while paused at `yield` closes the generator instead
+        cancel_event.set()
+        metrics.increment("cancellation.runs_cancelled")
+        logger.info("Client disconnected; cancelled run %s", thread_id)
+        raise
+
+
+@router.post("/stream", tags=["Agent"])
+async def stream_agent(request: InvokeRequest):
+    """
+    Invoke the Deep Agent and stream back events as they happen.
+    """
+    # Referenced file bodies are read from disk, so build off the event loop
+    agent_input = await asyncio.to_thread(build_agent_input, request)
+    return StreamingResponse(
+        stream_generator(agent_input), media_type="text/event-stream"
+    )
+
+
+@router.post("/invoke", response_model=InvokeResponse, tags=["Agent"])
+async def invoke_agent(request: InvokeRequest) -> InvokeResponse:
+    agent_input = await asyncio.to_thread(build_agent_input, request)
+    config = {"configurable": {"thread_id": str(uuid.uuid4())}}
+    final_state = await agent_executor.ainvoke(agent_input, config=config)
+    return await build_invoke_response(final_state, request.files_mode)
+
+
+async def batch_generator(request: BatchInvokeRequest, agent_inputs: list[dict]):
+    """
+    Generator function that runs a batch of agent invocations and streams back
+    one NDJSON line per item, in completion order.
+
+    Items run with bounded parallelism and share the process-wide search and
+    summarization clients. The batch limit is enforced with a semaphore rather
+    than the run config's `max_concurrency`, which the graph would inherit and
+    apply to each item's own parallel tool calls. A client disconnect cancels
+    every item still running.
+    """
+    cancel_event = open_cancellation_scope()
+    max_concurrency = min(
+        request.max_concurrency or settings.BATCH_MAX_CONCURRENCY,
+        settings.BATCH_MAX_CONCURRENCY,
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_item(index: int, agent_input: dict):
+        config = {
+            "configurable": {"thread_id": str(uuid.uuid4())},
+            "callbacks": [CancellationCallbackHandler(cancel_event)],
+        }
+        async with semaphore:
+            try:
+                return index, await agent_executor.ainvoke(agent_input, config=config)
+            except Exception as exc:
+                return index, exc
+
+    tasks = [
+        asyncio.create_task(run_item(index, agent_input))
+        for index, agent_input in enumerate(agent_inputs)
+    ]
+    try:
+        for next_item in asyncio.as_completed(tasks):
+            index, final_state = await next_item
+            if isinstance(final_state, Exception):
+                metrics.increment("batch.items_failed")
+                logger.warning("Batch item %d failed: %s", index, final_state)
+                item = BatchItemResult(index=index, error=str(final_state))
+            else:
+                metrics.increment("batch.items_completed")
+                response = await build_invoke_response(
+                    final_state, request.requests[index].files_mode
+                )
+                item = BatchItemResult(index=index, response=response)
+            yield item.model_dump_json(exclude_none=True) + "\n"
+    except (asyncio.CancelledError, GeneratorExit):
+        cancel_event.set()
+        metrics.increment("cancellation.runs_cancelled")
+        logger.info("Client disconnected; cancelled batch of %d", len(agent_inputs))
+        raise
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@router.post("/batch", tags=["Agent"])
+async def batch_invoke_agent(request: BatchInvokeRequest):
+    """
+    Invoke the Deep Agent for many independent requests and stream back each
+    result as NDJSON as soon as it completes.
+    """
+    if len(request.requests) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch size exceeds the limit of {settings.BATCH_MAX_ITEMS} items",
+        )
+    agent_inputs = await asyncio.to_thread(
+        lambda: [build_agent_input(item) for item in request.requests]
+    )
+    metrics.increment("batch.requests")
+    metrics.increment("batch.items_submitted", len(request.requests))
+    return StreamingResponse(
+        batch_generator(request, agent_inputs), media_type="application/x-ndjson"
+    )
+
+
+@router.get("/files/{sha256}", tags=["Files"])
+async def get_file(sha256: str, http_request: Request) -> Response:
+    """
+    Serve a stored file body by content hash. Responses carry the hash as a
+    strong ETag and are gzip-compressed when the client accepts it.
+    """
+    etag = f'"{sha256}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400, immutable"}
+    if etag in http_request.headers.get("if-none-match", ""):
+        if not await asyncio.to_thread(file_store.touch, sha256):
+            raise HTTPException(status_code=404, detail="File not found")
+        return Response(status_code=304, headers=headers)
+
+    content = await asyncio.to_thread(file_store.get, sha256)
+    if content is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    body = content.encode("utf-8")
+    headers["Vary"] = "Accept-Encoding"
+    if "gzip" in http_request.headers.get("accept-encoding", "") and len(body) > 1024:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="text/markdown; charset=utf-8", headers=headers)
@@ -21,6 +21,79 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str
     LANGSMITH_API_KEY: str | None = None
 
+    # Batch invocation
+    BATCH_MAX_CONCURRENCY: int = 4
+    BATCH_MAX_ITEMS: int = 500
+
+    # Shared outbound HTTP client pool (HTTP/2 also needs `h2`, from httpx[http2])
+    HTTP2_ENABLED: bool = False
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 8
+    HTTP_TIMEOUT: float = 60.0
+
+    # Models, with optional fallbacks tried when a call times out or errors
+    ORCHESTRATOR_MODEL: str = "anthropic:claude-sonnet-4-20250514"
+    ORCHESTRATOR_FALLBACK_MODEL: str | None = None
+    SUMMARIZATION_MODEL: str = "openai:gpt-4o-mini"
+    SUMMARIZATION_FALLBACK_MODEL: str | None = None
+
+    # LLM call policy: per-call timeout and optional hedged requests sent once a
+    # call is slower than the given percentile of that model's recent latencies
+    LLM_TIMEOUT: float = 120.0
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+
+    # Memory budget for the postings cache behind the search_files tool
+    FILE_INDEX_MAX_MB: int = 64
+
+    # Webpage summarization: pages up to SMALL_PAGE_TOKENS are packed together
+    # into one LLM call until BATCH_TOKEN_BUDGET is reached
+    SUMMARIZATION_SMALL_PAGE_TOKENS: int = 2000
+    SUMMARIZATION_BATCH_TOKEN_BUDGET: int = 8000
+
+    # Local research knowledge base consulted before web search
+    KNOWLEDGE_BASE_ENABLED: bool = False
+    KNOWLEDGE_BASE_PATH: str = "data/knowledge_base.sqlite3"
+    KNOWLEDGE_BASE_MAX_AGE_HOURS: float = 72.0
+    KNOWLEDGE_BASE_MIN_TERM_COVERAGE: float = 0.8
+    KNOWLEDGE_BASE_MIN_SCORE: float = 1.0
+
+    # Content-addressed file store for manifest responses
+    FILE_STORE_PATH: str = "data/files"
+    FILE_STORE_MAX_AGE_HOURS: float = 24.0
+
+    # How often expired file bodies and knowledge-base pages are pruned
+    STORE_PRUNE_INTERVAL_MINUTES: float = 60.0
+
+    # Admin endpoints (profiling) are disabled unless a token is set
+    ADMIN_TOKEN: str | None = None
+    # Per-request profiles, shared by all workers
+    PROFILE_STORE_PATH: str = "data/profiles"
+
+    # Event-loop lag monitor: log when the loop is blocked beyond the threshold
+    EVENT_LOOP_LAG_MONITOR_ENABLED: bool = True
+    EVENT_LOOP_LAG_INTERVAL: float = 0.5
+    EVENT_LOOP_LAG_THRESHOLD: float = 0.1
+
+    # Logging: records below WARNING can be sampled per logger name (a logger
+    # and its children, "" for the root) and rate-limited per logger; records
+    # are written by a background thread and dropped if the queue is full
+    # (with LOG_QUEUE_ENABLED off, they are written on the calling thread)
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+    LOG_RATE_LIMIT_PER_SECOND: float = 0
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Server runtime (used by `python -m app.server`)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 1
+    SERVER_GRACEFUL_SHUTDOWN_TIMEOUT: int = 30
+    SERVER_KEEP_ALIVE_TIMEOUT: int = 5
+
 
 # Create a single, importable instance of the settings
 settings = Settings()
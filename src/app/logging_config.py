@@ -1,18 +1,195 @@
+import atexit
 import logging
+import queue
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+
 from pythonjsonlogger import jsonlogger
 
+from .config import settings
+from .services.metrics import metrics
+
+# Correlation id of the request being handled; copied into tool threads with
+# the rest of the context, so every log line of a request carries it
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+_listener: QueueListener | None = None
+
 
-def setup_logging():
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Queue handler that drops records instead of blocking when the queue is full.
+
+    Unlike the stdlib handler, it does not format records on the calling thread:
+    only the message arguments are merged (so later mutations of the arguments
+    cannot change the message), and `exc_info` is kept so the JSON formatter on
+    the listener thread renders tracebacks into their own field.
+    """
+
+    def prepare(self, record):
+        # A shallow copy, so other handlers still see the original record
+        prepared = logging.LogRecord.__new__(logging.LogRecord)
+        prepared.__dict__.update(record.__dict__)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        return prepared
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.increment("logging.dropped")
+
+
+class DrainingQueueListener(QueueListener):
+    """
+    Queue listener whose `stop` waits for room in a full queue instead of
+    raising, so shutdown under load still flushes every queued record.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Adds the current request id to every record.
+    """
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Samples and rate-limits records below WARNING, per logger.
+
+    Sample rates apply to a logger and its children (the longest configured
+    name prefix wins). The rate limit is a per-logger token bucket allowing
+    `rate_limit` records per second, in bursts of up to `max(1, rate_limit)`;
+    0 disables it.
+    """
+
+    def __init__(self, sample_rates: dict[str, float], rate_limit: float = 0):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limit = rate_limit
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def _sample_rate(self, name: str) -> float:
+        while name:
+            if name in self.sample_rates:
+                return self.sample_rates[name]
+            name = name.rpartition(".")[0]
+        return self.sample_rates.get("", 1.0)
+
+    def _take_token(self, name: str) -> bool:
+        # Hold at least one token, so rates below one per second still let
+        # records through
+        capacity = max(1.0, self.rate_limit)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(name, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * self.rate_limit)
+            allowed = tokens >= 1
+            self._buckets[name] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        if random.random() >= self._sample_rate(record.name):
+            metrics.increment("logging.sampled_out")
+            return False
+        if self.rate_limit and not self._take_token(record.name):
+            metrics.increment("logging.rate_limited")
+            return False
+        return True
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware that assigns each request a correlation id, taken from the
+    `X-Request-ID` header when present, and echoes it in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        request_id = headers.get(b"x-request-id", b"").decode()[:128]
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"x-request-id", request_id.encode()),
+                    ],
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+def stop_logging():
+    """
+    Stops the background log writer after flushing the records already queued.
+    Later records are written synchronously, so shutdown logs are not lost.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logger = logging.getLogger()
+    for handler in logger.handlers[:]:
+        if isinstance(handler, NonBlockingQueueHandler):
+            logger.removeHandler(handler)
+            for target in _listener.handlers:
+                for log_filter in handler.filters:
+                    target.addFilter(log_filter)
+                logger.addHandler(target)
+    _listener = None
+
+
+# Flush queued records when the process exits without a lifespan shutdown
+atexit.register(stop_logging)
+
+
+def setup_logging(stream=None):
     """
     Configures structured JSON logging for the application.
+
+    Log calls only filter and enqueue records; JSON formatting and writing to
+    the stream (stderr by default) happen on a background listener thread, so
+    logging never blocks request handling. With `LOG_QUEUE_ENABLED` off,
+    records are formatted and written on the calling thread instead.
     """
+    global _listener
+
+    stop_logging()
     logger = logging.getLogger()
     # Remove any existing handlers
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
 
     # Create a new handler that streams to console
-    log_handler = logging.StreamHandler()
+    log_handler = logging.StreamHandler(stream)
 
     # Use a custom formatter to output logs in JSON format
     formatter = jsonlogger.JsonFormatter(
@@ -20,8 +197,25 @@ def setup_logging():
     )
     log_handler.setFormatter(formatter)
 
-    # Add the new handler to the root logger
-    logger.addHandler(log_handler)
+    filters = [
+        SamplingFilter(settings.LOG_SAMPLE_RATES, settings.LOG_RATE_LIMIT_PER_SECOND),
+        RequestContextFilter(),
+    ]
+    if settings.LOG_QUEUE_ENABLED:
+        # Hand records to the console handler through a bounded queue
+        log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        root_handler: logging.Handler = NonBlockingQueueHandler(log_queue)
+        _listener = DrainingQueueListener(
+            log_queue, log_handler, respect_handler_level=True
+        )
+        _listener.start()
+    else:
+        root_handler = log_handler
+    for log_filter in filters:
+        root_handler.addFilter(log_filter)
+
+    # Add the handler to the root logger
+    logger.addHandler(root_handler)
     logger.setLevel(logging.INFO)
 
     # Mute overly verbose third-party loggers
@@ -1,9 +1,19 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from .config import settings
+from .api.admin import RequestProfilingMiddleware
+from .api.admin import router as admin_router
 from .api.routes import router as api_router
-from .logging_config import setup_logging
+from .logging_config import RequestIdMiddleware, setup_logging, stop_logging
+from .services.file_store import file_store
+from .services.http_client import http_clients
+from .services.metrics import metrics
+from .services.profiling import EventLoopLagMonitor
+from .tools.research_tools import get_knowledge_base
 
 # Get the logger instance
 logger = logging.getLogger(__name__)
@@ -11,15 +21,73 @@ logger = logging.getLogger(__name__)
 # Call the setup function to configure logging
 setup_logging()
 
+
+def prune_stores() -> None:
+    """
+    Deletes stored file bodies that have not been used recently and
+    knowledge-base pages older than the freshness window.
+    """
+    file_store.prune(settings.FILE_STORE_MAX_AGE_HOURS * 3600)
+    knowledge_base = get_knowledge_base()
+    if knowledge_base is not None:
+        knowledge_base.prune(settings.KNOWLEDGE_BASE_MAX_AGE_HOURS * 3600)
+
+
+async def prune_stores_periodically() -> None:
+    """
+    Runs `prune_stores` on startup and then every STORE_PRUNE_INTERVAL_MINUTES,
+    off the event loop.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(prune_stores)
+        except Exception:
+            logger.exception("Pruning the file store and knowledge base failed")
+        await asyncio.sleep(settings.STORE_PRUNE_INTERVAL_MINUTES * 60)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Creates the shared outbound HTTP clients on startup and closes them on shutdown.
+    While the app is up, it periodically prunes the file store and knowledge
+    base and runs the event-loop lag monitor; queued logs are flushed on
+    shutdown.
+    """
+    http_clients.start()
+    prune_task = asyncio.create_task(prune_stores_periodically())
+    lag_monitor = None
+    if settings.EVENT_LOOP_LAG_MONITOR_ENABLED:
+        lag_monitor = EventLoopLagMonitor(
+            interval=settings.EVENT_LOOP_LAG_INTERVAL,
+            threshold=settings.EVENT_LOOP_LAG_THRESHOLD,
+        )
+        lag_monitor.start()
+    yield
+    prune_task.cancel()
+    if lag_monitor is not None:
+        await lag_monitor.stop()
+    await http_clients.aclose()
+    stop_logging()
+
+
 # Instantiate the FastAPI application
 app = FastAPI(
     title="Deep Agent Service",
     description="A FastAPI service for the Deep Agent research agent.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
-# Include the API router
+# Profile individual requests tagged with X-Profile-Request (admin only)
+app.add_middleware(RequestProfilingMiddleware)
+
+# Tag every request (and its log records) with an X-Request-ID correlation id
+app.add_middleware(RequestIdMiddleware)
+
+# Include the API and admin routers
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(admin_router, prefix="/admin")
 
 
 @app.get("/health", tags=["Health"])
@@ -30,3 +98,11 @@ async def health_check():
     """
     logger.info("Health check endpoint was called.")
     return {"status": "ok", "environment": settings.ENVIRONMENT}
+
+
+@app.get("/metrics", tags=["Health"])
+async def get_metrics():
+    """
+    Returns the in-process service counters (cancellations, cache hits, etc.).
+    """
+    return metrics.snapshot()
@@ -1,11 +1,12 @@
 """State management for deep agents with TODO tracking and virtual file systems.
 
 This module defines the extended agent state structure that supports:
-- Task planning and progress tracking through TODO lists
+- Task planning and progress tracking through TODO lists, updated incrementally
 - Context offloading through a virtual file system stored in state
 - Efficient state merging with reducer functions
 """
 
+import uuid
 from typing import Annotated, Literal, NotRequired
 from typing_extensions import TypedDict
 
@@ -16,14 +17,68 @@ class Todo(TypedDict):
     """A structured task item for tracking progress through complex workflows.
 
     Attributes:
+        id: Stable identifier, assigned when the task is added
         content: Short, specific description of the task
         status: Current state - pending, in_progress, or completed
     """
 
+    id: NotRequired[str]
     content: str
     status: Literal["pending", "in_progress", "completed"]
 
 
+class TodoOps(TypedDict, total=False):
+    """Incremental changes to the TODO list, applied by `todo_reducer`.
+
+    Attributes:
+        add: Todos to append to the list
+        update: Fields to change, keyed by todo id
+        remove: Ids of todos to delete
+    """
+
+    add: list[Todo]
+    update: dict[str, dict]
+    remove: list[str]
+
+
+def new_todo_id() -> str:
+    """Generate a short, stable identifier for a new todo."""
+    return uuid.uuid4().hex[:8]
+
+
+def with_todo_ids(todos: list[Todo]) -> list[Todo]:
+    """Return the todos with an id assigned to every todo that lacks one."""
+    return [todo if todo.get("id") else {**todo, "id": new_todo_id()} for todo in todos]
+
+
+def todo_reducer(left, right):
+    """Apply a TODO list update to the existing list.
+
+    A list replaces the whole TODO list (e.g. a new plan or the request input),
+    while a `TodoOps` dict adds, updates and removes individual todos by id,
+    so tools only need to send what changed.
+
+    Args:
+        left: Existing TODO list
+        right: New TODO list, or TodoOps to apply to the existing list
+
+    Returns:
+        Updated TODO list, with an id on every todo
+    """
+    if right is None:
+        return left
+    if isinstance(right, list):
+        return with_todo_ids(right)
+    removed = set(right.get("remove", []))
+    updates = right.get("update", {})
+    todos = [
+        {**todo, **updates.get(todo["id"], {})}
+        for todo in with_todo_ids(left or [])
+        if todo["id"] not in removed
+    ]
+    return todos + with_todo_ids(right.get("add", []))
+
+
 def file_reducer(left, right):
     """Merge two file dictionaries, with right side taking precedence.
 
@@ -49,9 +104,10 @@ class DeepAgentState(AgentState):
     """Extended agent state that includes task tracking and virtual file system.
 
     Inherits from LangGraph's AgentState and adds:
-    - todos: List of Todo items for task planning and progress tracking
+    - todos: List of Todo items for task planning and progress tracking,
+      updated with full lists or incremental TodoOps
     - files: Virtual file system stored as dict mapping filenames to content
     """
 
-    todos: NotRequired[list[Todo]]
+    todos: Annotated[NotRequired[list[Todo]], todo_reducer]
     files: Annotated[NotRequired[dict[str, str]], file_reducer]
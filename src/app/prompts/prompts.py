@@ -4,26 +4,30 @@ This module contains all the system prompts, tool descriptions, and instruction
 templates used throughout the deep agents educational framework.
 """
 
-WRITE_TODOS_DESCRIPTION = """Create and manage structured task lists for tracking progress through complex workflows.
+WRITE_TODOS_DESCRIPTION = """Create or replace the structured task list used to track progress through complex workflows.
 
 ## When to Use
-- Multi-step or non-trivial tasks requiring coordination
+- At the start of a multi-step or non-trivial task, to write the initial plan
 - When user provides multiple tasks or explicitly requests todo list  
+- When the plan changes so much that most tasks would be rewritten
 - Avoid for single, trivial actions unless directed otherwise
 
 ## Structure
 - Maintain one list containing multiple todo objects (content, status, id)
 - Use clear, actionable content descriptions
 - Status must be: pending, in_progress, or completed
+- Each todo gets a stable id, returned by this tool; keep existing ids when rewriting
 
 ## Best Practices  
 - Only one in_progress task at a time
 - Mark completed immediately when task is fully done
-- Always send the full updated list when making changes
 - Prune irrelevant items to keep list focused
 
 ## Progress Updates
-- Call TodoWrite again to change task status or edit content
+- Do NOT resend the whole list for small changes; use the incremental tools:
+  - update_todo to change one task's status (or content) by id
+  - add_todos to append new tasks
+  - remove_todos to drop tasks by id
 - Reflect real-time progress; don't batch completions  
 - If blocked, keep in_progress and add new task describing blocker
 
@@ -31,13 +35,13 @@ WRITE_TODOS_DESCRIPTION = """Create and manage structured task lists for trackin
 - todos: List of TODO items with content and status fields
 
 ## Returns
-Updates agent state with new todo list."""
+The ids assigned to the todos, in order."""
 
 TODO_USAGE_INSTRUCTIONS = """Based upon the user's request:
-1. Use the write_todos tool to create TODO at the start of a user request, per the tool description.
-2. After you accomplish a TODO, use the read_todos to read the TODOs in order to remind yourself of the plan. 
+1. Use the write_todos tool to create TODO at the start of a user request, per the tool description. Note the ids it returns.
+2. Before starting a TODO, mark it in_progress with update_todo; use read_todos if you need to remind yourself of the plan and the ids.
 3. Reflect on what you've done and the TODO.
-4. Mark you task as completed, and proceed to the next TODO.
+4. Mark you task as completed with update_todo, and proceed to the next TODO. Use add_todos and remove_todos to adjust the plan instead of rewriting it.
 5. Continue this process until you have completed all TODOs.
 
 IMPORTANT: Always create a research plan of TODOs and conduct research following the above guidelines for ANY user request.
@@ -71,13 +75,24 @@ Parameters:
 
 Important: This replaces the entire file content."""
 
+SEARCH_FILES_DESCRIPTION = """Search the contents of all files in the virtual filesystem and return the best matching lines.
+
+Results are ranked by relevance (BM25) and each one shows the file path, line number and the matching line, so you can locate facts without reading whole files.
+
+Parameters:
+- query (required): Keywords describing the information you are looking for
+- max_results (optional, default=5): Maximum number of matching lines to return
+
+Use read_file() with an offset near a returned line number when you need the surrounding context."""
+
 FILE_USAGE_INSTRUCTIONS = """You have access to a virtual file system to help you retain and save context.
 
 ## Workflow Process
 1. **Orient**: Use ls() to see existing files before starting work
 2. **Save**: Use write_file() to store the user's request so that we can keep it for later 
 3. **Research**: Proceed with research. The search tool will write files.  
-4. **Read**: Once you are satisfied with the collected sources, read the files and use them to answer the user's question directly.
+4. **Search**: Use search_files() to locate specific facts across the saved files without reading them in full.
+5. **Read**: Once you are satisfied with the collected sources, read the relevant parts of the files and use them to answer the user's question directly.
 """
 
 SUMMARIZE_WEB_SEARCH = """You are creating a minimal summary for research steering - your goal is to help an agent know what information it has collected, NOT to preserve all details.
@@ -106,6 +121,26 @@ Output format:
 Today's date: {date}
 """
 
+SUMMARIZE_WEB_SEARCH_BATCH = """You are creating minimal summaries for research steering - your goal is to help an agent know what information it has collected, NOT to preserve all details.
+
+Below are {count} separate webpages, each wrapped in a <webpage> tag with an index.
+
+{webpages}
+
+For EACH webpage, create a VERY CONCISE summary focusing on:
+1. Main topic/subject in 1-2 sentences
+2. Key information type (facts, tutorial, news, analysis, etc.)  
+3. Most significant 1-2 findings or points
+
+Keep each summary under 150 words total and never mix content from different webpages. The agent needs to know what's in each file to decide if it should search for more information or use this source.
+
+For each webpage, generate a descriptive filename that indicates the content type and topic (e.g., "mcp_protocol_overview.md", "ai_safety_research_2024.md").
+
+Return exactly {count} summaries, one per webpage. Set each summary's `index` to the index of the <webpage> tag it summarizes.
+
+Today's date: {date}
+"""
+
 RESEARCHER_INSTRUCTIONS = """You are a research assistant conducting research on the user's input topic. For context, today's date is {date}.
 
 <Task>
@@ -115,7 +150,7 @@ You can use any of the tools provided to you to find resources that can help ans
 
 <Available Tools>
 You have access to two main tools:
-1. **tavily_search**: For conducting web searches to gather information
+1. **tavily_search**: For conducting web searches to gather information. It accepts a list of queries that run concurrently in one call - pass several distinct queries at once to cover different angles instead of making one call per query
 2. **think_tool**: For reflection and strategic planning during research
 
 **CRITICAL: Use think_tool after each search to reflect on results and plan next steps**
@@ -125,7 +160,7 @@ You have access to two main tools:
 Think like a human researcher with limited time. Follow these steps:
 
 1. **Read the question carefully** - What specific information does the user need?
-2. **Start with broader searches** - Use broad, comprehensive queries first
+2. **Start with broader searches** - Use broad, comprehensive queries first, batching related queries into a single tavily_search call
 3. **After each search, pause and assess** - Do I have enough to answer? What's still missing?
 4. **Execute narrower searches as you gather information** - Fill in the gaps
 5. **Stop when you can answer confidently** - Don't keep searching for perfection
@@ -0,0 +1,32 @@
+"""Production server entry point.
+
+Runs the FastAPI application under uvicorn with the number of worker processes
+configured in `Settings`. Each worker imports `app.main` itself, so the agent
+graph, HTTP client pool, caches and metrics are created per process and never
+shared across a fork. On shutdown, workers stop accepting connections and give
+in-flight requests (including open streams) up to the configured grace period
+to finish before they are cancelled.
+
+Usage:
+    python -m app.server
+"""
+
+import uvicorn
+
+from app.config import settings
+
+
+def main():
+    """Start uvicorn with the configured host, port and worker count."""
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.SERVER_WORKERS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_TIMEOUT,
+    )
+
+
+if __name__ == "__main__":
+    main()
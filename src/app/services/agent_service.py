@@ -4,8 +4,16 @@ from langchain.chat_models import init_chat_model
 from langgraph.prebuilt import create_react_agent
 
 # Imports from our new project structure
-from app.tools.file_tools import ls, read_file, write_file
-from app.tools.todo_tools import read_todos, write_todos
+from app.config import settings
+from app.services.resilient_model import create_resilient_model
+from app.tools.file_tools import ls, read_file, search_files, write_file
+from app.tools.todo_tools import (
+    add_todos,
+    read_todos,
+    remove_todos,
+    update_todo,
+    write_todos,
+)
 from app.tools.research_tools import tavily_search, think_tool, get_today_str
 from app.tools.task_tool import _create_task_tool
 from app.models.state import DeepAgentState
@@ -21,12 +29,28 @@ def create_deep_agent():
     """
     Factory function to create the main Deep Agent graph.
     """
-    # Initialize the primary language model
-    model = init_chat_model(model="anthropic:claude-sonnet-4-20250514", temperature=0.0)
+    # Initialize the primary language model, wrapped with timeouts and failover
+    model_names = [settings.ORCHESTRATOR_MODEL]
+    if settings.ORCHESTRATOR_FALLBACK_MODEL:
+        model_names.append(settings.ORCHESTRATOR_FALLBACK_MODEL)
+    model = create_resilient_model(
+        {name: init_chat_model(model=name, temperature=0.0) for name in model_names}
+    )
 
     # --- Define Tools ---
     sub_agent_tools = [tavily_search, think_tool]
-    built_in_tools = [ls, read_file, write_file, write_todos, read_todos, think_tool]
+    built_in_tools = [
+        ls,
+        read_file,
+        write_file,
+        search_files,
+        write_todos,
+        add_todos,
+        update_todo,
+        remove_todos,
+        read_todos,
+        think_tool,
+    ]
 
     # --- Define Research Sub-Agent ---
     research_sub_agent = {
@@ -0,0 +1,83 @@
+"""Cancellation propagation for agent runs.
+
+When a client goes away, the API layer cancels the run it started. Sync tools
+and sub-agents run in worker threads that asyncio cancellation cannot reach, so
+every run also carries a cancellation event:
+- The event is stored in a context variable, which LangChain copies into the
+  worker threads used for tools, so long-running tools can poll it
+- A callback handler inherited by every child run (including sub-agents spawned
+  by the `task` tool) aborts the next LLM call or tool call once it is set
+"""
+
+import threading
+from contextvars import ContextVar
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.services.metrics import metrics
+
+_cancel_event: ContextVar[threading.Event | None] = ContextVar(
+    "cancel_event", default=None
+)
+
+
+class RunCancelledError(Exception):
+    """Raised inside a run once the run has been cancelled."""
+
+
+def open_cancellation_scope() -> threading.Event:
+    """Create a cancellation event for the current run and make it current.
+
+    Returns:
+        The event; setting it cancels the run and everything it spawned
+    """
+    event = threading.Event()
+    _cancel_event.set(event)
+    return event
+
+
+def is_cancelled() -> bool:
+    """Return True if the run executing in the current context was cancelled."""
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def raise_if_cancelled(operation: str, event: threading.Event | None = None) -> None:
+    """Abort the current operation if its run was cancelled.
+
+    Args:
+        operation: Kind of work being skipped, used to label the saved-work metric
+        event: Cancellation event to check (default: the current context's event)
+
+    Raises:
+        RunCancelledError: If the run was cancelled
+    """
+    event = event if event is not None else _cancel_event.get()
+    if event is not None and event.is_set():
+        metrics.increment(f"cancellation.skipped_{operation}")
+        raise RunCancelledError(f"Run cancelled before {operation}")
+
+
+class CancellationCallbackHandler(BaseCallbackHandler):
+    """Callback handler that aborts LLM and tool calls of a cancelled run.
+
+    Callbacks are inherited by child runs, so attaching this handler to the root
+    run config stops the whole run tree, including nested sub-agents.
+    """
+
+    raise_error = True
+
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def on_chat_model_start(
+        self, serialized: Any, messages: Any, **kwargs: Any
+    ) -> None:
+        raise_if_cancelled("llm_calls", self.event)
+
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        raise_if_cancelled("llm_calls", self.event)
+
+    def on_tool_start(self, serialized: Any, input_str: str, **kwargs: Any) -> None:
+        raise_if_cancelled("tool_calls", self.event)
@@ -0,0 +1,169 @@
+"""Full-text search over the virtual file system.
+
+Files in `DeepAgentState.files` are indexed line by line so that searches can
+return ranked snippets with file/line references instead of whole files.
+
+The index is maintained incrementally: each file's postings are computed once
+per distinct content and cached by content hash, so re-indexing after a new
+file is written only tokenizes that file. Tools that write files warm the
+cache eagerly; searches index any file they have not seen yet. Each cached file
+keeps an inverted index (term -> lines and term frequencies) but not its text,
+and the cache is bounded by an estimate of its memory use. Ranking uses BM25
+with line-level documents.
+"""
+
+import hashlib
+import heapq
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from app.config import settings
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+# Rough per-item memory costs used to bound the cache
+_POSTING_BYTES = 80
+_TERM_BYTES = 120
+
+
+@dataclass
+class IndexedFile:
+    """Line-level inverted index for one version of a file's content."""
+
+    postings: dict[str, list[tuple[int, int]]]
+    lengths: list[int]
+    num_docs: int
+    total_length: int
+    size_bytes: int
+
+    @classmethod
+    def build(cls, content: str) -> "IndexedFile":
+        postings: dict[str, list[tuple[int, int]]] = {}
+        lengths = []
+        num_postings = 0
+        for i, line in enumerate(content.splitlines()):
+            tokens = tokenize(line)
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((i, tf))
+                num_postings += 1
+        size_bytes = (
+            num_postings * _POSTING_BYTES
+            + sum(len(term) + _TERM_BYTES for term in postings)
+            + len(lengths) * 8
+        )
+        return cls(
+            postings,
+            lengths,
+            sum(1 for length in lengths if length),
+            sum(lengths),
+            size_bytes,
+        )
+
+
+@dataclass
+class SearchHit:
+    """A ranked line matching a search query."""
+
+    file_path: str
+    line_number: int
+    score: float
+    snippet: str
+
+
+class FileIndex:
+    """Content-hash keyed cache of per-file postings with BM25 search.
+
+    Args:
+        max_bytes: Approximate memory budget for cached postings; least
+            recently used files are evicted beyond it
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, IndexedFile] = OrderedDict()
+        self._size_bytes = 0
+
+    def add(self, content: str) -> IndexedFile:
+        """Index `content` if it is not cached yet and return its postings."""
+        key = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = IndexedFile.build(content)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._size_bytes += entry.size_bytes
+            while self._size_bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size_bytes -= evicted.size_bytes
+        return entry
+
+    def search(
+        self, files: dict[str, str], query: str, max_results: int = 5
+    ) -> list[SearchHit]:
+        """Rank the lines of `files` against `query` using BM25.
+
+        Only the postings of the query terms are visited, so the cost depends
+        on how many lines match rather than on the size of the files.
+
+        Args:
+            files: Virtual file system mapping paths to content
+            query: Free-text query
+            max_results: Maximum number of hits to return
+
+        Returns:
+            Hits sorted by descending score
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        indexed = {path: self.add(content) for path, content in files.items()}
+        num_docs = sum(entry.num_docs for entry in indexed.values())
+        if not num_docs:
+            return []
+        avg_length = sum(entry.total_length for entry in indexed.values()) / num_docs
+        idf = {}
+        for term in terms:
+            df = sum(len(entry.postings.get(term, ())) for entry in indexed.values())
+            if df:
+                idf[term] = math.log((num_docs - df + 0.5) / (df + 0.5) + 1)
+
+        scores: dict[tuple[str, int], float] = {}
+        for path, entry in indexed.items():
+            for term, weight in idf.items():
+                for i, tf in entry.postings.get(term, ()):
+                    norm = K1 * (1 - B + B * entry.lengths[i] / avg_length)
+                    score = weight * tf * (K1 + 1) / (tf + norm)
+                    scores[path, i] = scores.get((path, i), 0.0) + score
+
+        top = heapq.nlargest(max_results, scores.items(), key=lambda item: item[1])
+        lines: dict[str, list[str]] = {}
+        hits = []
+        for (path, i), score in top:
+            if path not in lines:
+                lines[path] = files[path].splitlines()
+            hits.append(SearchHit(path, i + 1, score, lines[path][i]))
+        return hits
+
+
+# Create a single, importable instance of the index
+file_index = FileIndex(settings.FILE_INDEX_MAX_MB * 1024 * 1024)
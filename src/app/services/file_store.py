@@ -0,0 +1,103 @@
+"""Content-addressed storage for virtual files.
+
+When a client asks for a file manifest instead of inline file contents, the
+bodies of the run's files are written here, keyed by their SHA-256 hash, and
+served separately by the `/files/{content_hash}` endpoint. Clients can then
+refer to files the server already holds by hash in later requests.
+
+Files are stored on disk so that every worker process can serve them.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from app.config import settings
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def content_hash(content: str) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class FileStore:
+    """Disk-backed, content-addressed store of file bodies.
+
+    Args:
+        path: Directory holding the stored files (created on first write)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], digest)
+
+    def put(self, content: str) -> str:
+        """Store `content` if it is not stored yet and return its hash."""
+        digest = content_hash(content)
+        blob_path = self._blob_path(digest)
+        if os.path.exists(blob_path):
+            # Refresh the modification time so pruning keeps files still in use
+            os.utime(blob_path)
+            return digest
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(blob_path))
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+            tmp_file.write(content)
+        # Atomic rename so concurrent readers never see a partial file
+        os.replace(tmp_path, blob_path)
+        return digest
+
+    def touch(self, digest: str) -> bool:
+        """Mark `digest` as used, so pruning keeps it; return whether it is held."""
+        if not _HASH_RE.match(digest):
+            return False
+        try:
+            os.utime(self._blob_path(digest))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def get(self, digest: str) -> str | None:
+        """Return the stored content for `digest`, or None if it is not held.
+
+        Reading a file counts as using it, so files that clients keep
+        referencing are not pruned.
+        """
+        if not _HASH_RE.match(digest):
+            return None
+        try:
+            with open(self._blob_path(digest), encoding="utf-8") as blob:
+                content = blob.read()
+        except FileNotFoundError:
+            return None
+        self.touch(digest)
+        return content
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete files not written or read within `max_age_seconds`.
+
+        Returns:
+            Number of files deleted
+        """
+        cutoff = time.time() - max_age_seconds
+        deleted = 0
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                blob_path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(blob_path) < cutoff:
+                        os.remove(blob_path)
+                        deleted += 1
+                except FileNotFoundError:
+                    continue
+        return deleted
+
+
+# Create a single, importable instance of the store
+file_store = FileStore(settings.FILE_STORE_PATH)
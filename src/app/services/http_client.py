@@ -0,0 +1,119 @@
+"""Application-scoped HTTP clients.
+
+This module owns the pooled `httpx` clients used for all outbound HTTP traffic
+that the service controls (page fetches and the summarization model). The
+clients are created in the FastAPI lifespan and closed on shutdown, so
+connections are reused across requests instead of being opened per call.
+"""
+
+import importlib.util
+import logging
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (installed by `httpx[http2]`)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientManager:
+    """Holds the shared sync and async HTTP clients and per-host connection caps."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        # Slots exist only while a request to the host holds or awaits one
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._host_users: dict[str, int] = {}
+
+    def _client_options(self) -> dict:
+        http2 = settings.HTTP2_ENABLED and _http2_available()
+        if settings.HTTP2_ENABLED and not http2:
+            logger.warning(
+                "HTTP2_ENABLED is set but `h2` is not installed; using HTTP/1.1"
+            )
+        return {
+            "http2": http2,
+            "limits": httpx.Limits(
+                max_connections=settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            "timeout": httpx.Timeout(settings.HTTP_TIMEOUT),
+        }
+
+    def start(self) -> None:
+        """Create the shared clients if they do not exist yet."""
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(**self._client_options())
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(**self._client_options())
+
+    async def aclose(self) -> None:
+        """Close the shared clients and release their connections."""
+        with self._lock:
+            client, self._client = self._client, None
+            async_client, self._async_client = self._async_client, None
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            await async_client.aclose()
+
+    @property
+    def client(self) -> httpx.Client:
+        """The shared sync client, created on first use outside the app lifespan."""
+        if self._client is None:
+            self.start()
+        client = self._client
+        if client is None:
+            # Closed again by a concurrent shutdown
+            raise RuntimeError("HTTP clients are closed")
+        return client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """The shared async client, created on first use outside the app lifespan."""
+        if self._async_client is None:
+            self.start()
+        async_client = self._async_client
+        if async_client is None:
+            # Closed again by a concurrent shutdown
+            raise RuntimeError("HTTP clients are closed")
+        return async_client
+
+    @contextmanager
+    def host_slot(self, url: str):
+        """Hold one of the per-host connection slots for the duration of a request."""
+        host = urlsplit(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(
+                    settings.HTTP_MAX_CONNECTIONS_PER_HOST
+                )
+                self._host_slots[host] = slot
+            self._host_users[host] = self._host_users.get(host, 0) + 1
+        try:
+            with slot:
+                yield
+        finally:
+            with self._lock:
+                users = self._host_users.pop(host) - 1
+                if users:
+                    self._host_users[host] = users
+                else:
+                    del self._host_slots[host]
+
+
+# Create a single, importable instance of the client manager
+http_clients = HTTPClientManager()
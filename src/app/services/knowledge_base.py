@@ -0,0 +1,226 @@
+"""Persistent research knowledge base.
+
+Pages fetched and summarized by `tavily_search` are stored in a local SQLite
+database with a full-text (FTS5) index, together with the time they were
+fetched. Before searching the web, `tavily_search` consults this store and
+answers from stored material when enough fresh, relevant pages are found.
+
+Documents are keyed by URL and tagged with the Tavily topic they were found
+under, so a page cached for one topic never answers another. The full-text index
+is an external-content FTS5 table over each document's title, summary and the
+query it was found for, kept in sync by triggers and addressed by rowid. Raw
+page content is stored but not indexed, so incidental words in a long page
+cannot make it match. Documents older than the freshness window are pruned.
+
+The database runs in WAL mode so several worker processes can share it.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from app.services.file_index import tokenize
+
+# Bump when the schema changes; stored pages are a cache, so older databases
+# are simply recreated
+_SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE documents (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    topic TEXT NOT NULL,
+    title TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    raw_content TEXT NOT NULL,
+    query TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX documents_fetched_at ON documents (fetched_at);
+CREATE VIRTUAL TABLE documents_fts USING fts5(
+    title, summary, query, content='documents', content_rowid='id'
+);
+CREATE TRIGGER documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts (rowid, title, summary, query)
+    VALUES (new.id, new.title, new.summary, new.query);
+END;
+CREATE TRIGGER documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, title, summary, query)
+    VALUES ('delete', old.id, old.title, old.summary, old.query);
+END;
+CREATE TRIGGER documents_au AFTER UPDATE ON documents BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, title, summary, query)
+    VALUES ('delete', old.id, old.title, old.summary, old.query);
+    INSERT INTO documents_fts (rowid, title, summary, query)
+    VALUES (new.id, new.title, new.summary, new.query);
+END;
+"""
+
+_DROP_SCHEMA = """
+DROP TABLE IF EXISTS documents_fts;
+DROP TABLE IF EXISTS documents;
+"""
+
+# Words too common to say anything about what a query is looking for
+_STOPWORDS = frozenset(
+    """
+    a about above after again against all also am an and any are as at be because
+    been before being below between both but by can could did do does doing down
+    during each few for from further had has have having he her here hers him his
+    how i if in into is it its itself just me more most my no nor not now of off
+    on once only or other our ours out over own same she should so some such than
+    that the their theirs them then there these they this those through to too
+    under until up very was we were what when where which while who whom why will
+    with would you your yours
+    """.split()
+)
+
+
+def query_terms(text: str) -> list[str]:
+    """Return the distinct, meaningful search terms in `text`, sorted."""
+    return sorted(
+        {
+            token
+            for token in tokenize(text)
+            if token not in _STOPWORDS and len(token) > 1
+        }
+    )
+
+
+@dataclass
+class StoredDocument:
+    """A previously fetched and summarized webpage."""
+
+    url: str
+    title: str
+    filename: str
+    summary: str
+    raw_content: str
+    fetched_at: float
+
+
+class KnowledgeBase:
+    """SQLite-backed store of summarized webpages with full-text lookup.
+
+    Args:
+        path: Path of the SQLite database file (created if missing)
+        min_term_coverage: Fraction of the query's terms (stopwords excluded) a
+            document's title, summary and original query must contain to count
+            as a match
+        min_score: Minimum BM25 relevance a document must reach. BM25 weighs
+            terms by how rare they are in the store, so a small store rarely
+            reaches it and searches fall through to the web
+    """
+
+    def __init__(
+        self, path: str, min_term_coverage: float = 0.8, min_score: float = 1.0
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.min_term_coverage = min_term_coverage
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10.0)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+            if version != _SCHEMA_VERSION:
+                # One transaction, so workers starting together do not interleave
+                self._conn.executescript(
+                    f"BEGIN IMMEDIATE; {_DROP_SCHEMA} {_SCHEMA} "
+                    f"PRAGMA user_version = {_SCHEMA_VERSION}; COMMIT;"
+                )
+
+    def store(
+        self,
+        url: str,
+        topic: str,
+        title: str,
+        filename: str,
+        summary: str,
+        raw_content: str,
+        query: str,
+    ) -> None:
+        """Insert or refresh the stored copy of a webpage."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO documents
+                    (url, topic, title, filename, summary, raw_content, query,
+                     fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (url) DO UPDATE SET
+                    topic = excluded.topic,
+                    title = excluded.title,
+                    filename = excluded.filename,
+                    summary = excluded.summary,
+                    raw_content = excluded.raw_content,
+                    query = excluded.query,
+                    fetched_at = excluded.fetched_at
+                """,
+                (url, topic, title, filename, summary, raw_content, query, time.time()),
+            )
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Delete documents fetched longer ago than `max_age_seconds`.
+
+        Returns:
+            Number of documents removed
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM documents WHERE fetched_at < ?",
+                (time.time() - max_age_seconds,),
+            )
+        return cursor.rowcount
+
+    def lookup(
+        self, query: str, topic: str, max_results: int, max_age_seconds: float
+    ) -> list[StoredDocument]:
+        """Find fresh stored webpages relevant to `query`.
+
+        Args:
+            query: Search query
+            topic: Search topic the documents must have been stored under
+            max_results: Maximum number of documents to return
+            max_age_seconds: Ignore documents fetched longer ago than this
+
+        Returns:
+            Matching documents, best match first
+        """
+        terms = query_terms(query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT d.url, d.title, d.filename, d.summary, d.raw_content,
+                       d.fetched_at, d.query, -bm25(documents_fts)
+                FROM documents_fts f JOIN documents d ON d.id = f.rowid
+                WHERE documents_fts MATCH ? AND d.topic = ? AND d.fetched_at >= ?
+                ORDER BY bm25(documents_fts)
+                LIMIT ?
+                """,
+                (match, topic, time.time() - max_age_seconds, max_results * 5),
+            ).fetchall()
+
+        documents = []
+        for *fields, stored_query, score in rows:
+            if score < self.min_score:
+                # Rows are ordered by score, so the rest score lower still
+                break
+            document = StoredDocument(*fields)
+            text_terms = set(
+                tokenize(f"{document.title} {document.summary} {stored_query}")
+            )
+            coverage = sum(term in text_terms for term in terms) / len(terms)
+            if coverage >= self.min_term_coverage:
+                documents.append(document)
+            if len(documents) == max_results:
+                break
+        return documents
@@ -0,0 +1,36 @@
+"""In-process metrics for the service.
+
+This module provides a small, thread-safe counter registry shared by the API
+layer, the agent tools and the sub-agents they spawn. Counters are kept per
+process and exposed through the `/metrics` endpoint.
+"""
+
+import threading
+from collections import defaultdict
+
+
+class MetricsRegistry:
+    """Thread-safe registry of named numeric counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add `value` to the counter called `name`."""
+        with self._lock:
+            self._counters[name] += value
+
+    def snapshot(self) -> dict[str, float]:
+        """Return a copy of all counters, sorted by name."""
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        with self._lock:
+            self._counters.clear()
+
+
+# Create a single, importable instance of the registry
+metrics = MetricsRegistry()
@@ -0,0 +1,197 @@
+"""Live profiling utilities for running workers.
+
+This module provides:
+- A sampling CPU profiler that periodically captures the stacks of all threads
+  and renders them in the collapsed ("folded") format understood by
+  flamegraph.pl, speedscope and similar tools
+- A helper that captures the top memory allocations with tracemalloc
+- An event-loop lag monitor: a watchdog thread notices when the event loop
+  stops making progress and logs the stack of whatever is blocking it (e.g. a
+  sync tool or HTTP fetch running on the loop)
+
+Everything is stdlib-only so it can be enabled in production images.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import traceback
+from collections import Counter
+from types import FrameType
+
+from app.services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads from a background thread.
+
+    Args:
+        interval: Seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, top_frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                frame: FrameType | None = top_frame
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Render the samples as collapsed stacks, one `stack count` per line."""
+        return "\n".join(
+            f"{stack} {count}" for stack, count in self.samples.most_common()
+        )
+
+
+def capture_allocations(snapshot: tracemalloc.Snapshot, limit: int = 50) -> str:
+    """Render the top allocation sites of a tracemalloc snapshot as text."""
+    stats = snapshot.statistics("lineno")
+    total = sum(stat.size for stat in stats)
+    lines = [f"Total traced memory: {total / 1024:.1f} KiB"]
+    lines.extend(str(stat) for stat in stats[:limit])
+    return "\n".join(lines)
+
+
+class Profile:
+    """A CPU (and optionally memory) profile covering a span of time.
+
+    Use `async with` on the event loop: stopping the sampler and taking the
+    tracemalloc snapshot can take a while and then run in a worker thread.
+    """
+
+    def __init__(self, interval: float = 0.01, trace_memory: bool = False):
+        self.profiler = SamplingProfiler(interval)
+        self.trace_memory = trace_memory
+        self._started_tracemalloc = False
+        self.allocations: str | None = None
+
+    def __enter__(self) -> "Profile":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.profiler.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.stop()
+        if self.trace_memory:
+            self.allocations = capture_allocations(tracemalloc.take_snapshot())
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+    async def __aenter__(self) -> "Profile":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await asyncio.to_thread(self.__exit__, *exc_info)
+
+    def render(self) -> str:
+        """Collapsed CPU stacks, followed by the allocation report if captured."""
+        output = self.profiler.collapsed()
+        if self.allocations is not None:
+            output += "\n\n# tracemalloc top allocations\n" + self.allocations
+        return output
+
+
+class EventLoopLagMonitor:
+    """Logs when the event loop is blocked for longer than a threshold.
+
+    A heartbeat task on the loop records when it last ran. A watchdog thread
+    checks the heartbeat and, when it is stale, logs the loop thread's current
+    stack once per stall.
+
+    Args:
+        interval: Seconds between heartbeats
+        threshold: Lag in seconds beyond the interval that counts as blocked
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self._last_beat = time.monotonic()
+        self._stop = threading.Event()
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._loop_thread_id: int | None = None
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the heartbeat task and the watchdog thread."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            lag = time.monotonic() - last_beat - self.interval
+            if lag <= self.threshold or last_beat == reported_beat:
+                continue
+            reported_beat = last_beat
+            metrics.increment("event_loop.blocked")
+            frame: FrameType | None = None
+            if self._loop_thread_id is not None:
+                frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            logger.warning(
+                "Event loop blocked for at least %.0f ms",
+                lag * 1000,
+                extra={"lag_ms": round(lag * 1000), "stack": stack},
+            )
@@ -0,0 +1,380 @@
+"""Chat model wrapper with timeouts, hedging and failover.
+
+A single slow upstream response can stall a whole ReAct loop. The
+`ResilientChatModel` wraps a primary chat model and optional fallbacks:
+- Every call is bounded by a per-call timeout (time to first chunk when
+  streaming)
+- Optionally, when a call to a model is slower than a percentile of that model's
+  recent latencies, a duplicate (hedged) request is sent and the first response
+  wins
+- If a model times out or errors, the next configured model is tried
+
+The same policy applies to `invoke` and to streaming, which is how every model
+call runs under `astream_events`. Latencies are tracked per model name (whole
+calls and time to first chunk separately) and drive the hedge threshold. The wrapper
+is itself a chat model, so it works with `create_react_agent`, `bind_tools` and
+`with_structured_output`, and can be tested with fake models of any latency.
+"""
+
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from functools import partial
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableConfig
+from pydantic import Field
+
+from app.config import settings
+from app.services.metrics import metrics
+
+# Inner model calls run without callbacks so that only the wrapper's own run
+# (and its token stream) is reported to tracers and event streams.
+_INNER_CONFIG: RunnableConfig = {"callbacks": []}
+
+
+class LatencyTracker:
+    """Thread-safe sliding window of call latencies per model name.
+
+    Args:
+        window: Number of most recent latencies kept per model
+    """
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record the latency of one successful call."""
+        with self._lock:
+            self._latencies[name].append(seconds)
+
+    def percentile(self, name: str, pct: float, min_samples: int = 1) -> float | None:
+        """Return the `pct` percentile latency, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._latencies[name])
+        if not samples or len(samples) < min_samples:
+            return None
+        rank = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[rank]
+
+
+# Create a single, importable tracker shared by all wrapped models
+latency_tracker = LatencyTracker()
+
+
+class ResilientChatModel(BaseChatModel):
+    """Chat model that adds timeouts, hedged requests and failover to other models."""
+
+    models: list[BaseChatModel] = Field(min_length=1)
+    """Primary model first, then fallbacks in order of preference."""
+    model_names: list[str]
+    """Names used for latency tracking and metrics, one per model."""
+    timeout: float | None = None
+    """Per-call timeout in seconds (time to first chunk when streaming)."""
+    hedge_percentile: float | None = None
+    """Send a hedged duplicate once a call exceeds this latency percentile."""
+    hedge_min_samples: int = 20
+    """Minimum latency samples before hedging starts."""
+    tracker: LatencyTracker = Field(default=latency_tracker, exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "resilient"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "ResilientChatModel":
+        """Bind tools to every wrapped model, keeping the failover policy.
+
+        The copy holds tool-bound runnables in place of the models
+        (`model_copy` skips validation); they are only invoked or streamed.
+        """
+        return self.model_copy(
+            update={
+                "models": [model.bind_tools(tools, **kwargs) for model in self.models]
+            }
+        )
+
+    def _metric(self, index: int, name: str) -> str:
+        return f"llm.{self.model_names[index]}.{name}"
+
+    def _latency_key(self, index: int, streaming: bool) -> str:
+        # Streams are timed to their first chunk, which is not comparable with
+        # the duration of a whole call, so they are tracked separately
+        name = self.model_names[index]
+        return f"{name}:first_chunk" if streaming else name
+
+    def _hedge_delay(self, latency_key: str) -> float | None:
+        if self.hedge_percentile is None:
+            return None
+        return self.tracker.percentile(
+            latency_key, self.hedge_percentile, self.hedge_min_samples
+        )
+
+    def _record_failure(self, index: int, exc: Exception) -> None:
+        kind = "timeouts" if isinstance(exc, TimeoutError) else "errors"
+        metrics.increment(self._metric(index, kind))
+
+    # --- Sync path (used by sub-agents running in worker threads) ---
+
+    def _attempt(self, index: int, messages: list[BaseMessage], **kwargs: Any):
+        start = time.monotonic()
+        result = self.models[index].invoke(messages, _INNER_CONFIG, **kwargs)
+        self.tracker.record(self._latency_key(index, False), time.monotonic() - start)
+        return result
+
+    def _attempt_stream(self, index: int, messages: list[BaseMessage], **kwargs: Any):
+        start = time.monotonic()
+        stream = iter(self.models[index].stream(messages, _INNER_CONFIG, **kwargs))
+        first = next(stream, None)
+        self.tracker.record(self._latency_key(index, True), time.monotonic() - start)
+        return first, stream
+
+    def _run_with_policy(self, index: int, attempt, latency_key: str):
+        """Run `attempt` on worker threads with the timeout and hedging policy."""
+        metrics.increment(self._metric(index, "calls"))
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+
+        def remaining(deadline: float) -> float:
+            return max(0.0, deadline - time.monotonic())
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            primary = executor.submit(copy_context().run, attempt)
+            futures = {primary}
+            hedge_delay = self._hedge_delay(latency_key)
+            if hedge_delay is not None:
+                timeout = (
+                    hedge_delay
+                    if deadline is None
+                    else min(hedge_delay, remaining(deadline))
+                )
+                done, _ = wait(futures, timeout=timeout)
+                if not done:
+                    metrics.increment(self._metric(index, "hedges"))
+                    futures.add(executor.submit(copy_context().run, attempt))
+
+            error: BaseException | None = None
+            while futures:
+                done, futures = wait(
+                    futures,
+                    timeout=None if deadline is None else remaining(deadline),
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    raise TimeoutError(f"{self.model_names[index]} timed out")
+                for future in done:
+                    error = future.exception()
+                    if error is None:
+                        if future is not primary:
+                            metrics.increment(self._metric(index, "hedge_wins"))
+                        return future.result()
+            # Every attempt finished, and failed
+            assert error is not None
+            raise error
+        finally:
+            # Abandon the losing request rather than waiting for it
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        error: Exception | None = None
+        for index in range(len(self.models)):
+            try:
+                message = self._run_with_policy(
+                    index,
+                    partial(self._attempt, index, messages, stop=stop, **kwargs),
+                    self._latency_key(index, False),
+                )
+            except Exception as exc:
+                self._record_failure(index, exc)
+                error = exc
+                continue
+            if index > 0:
+                metrics.increment(self._metric(index, "fallbacks"))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        # Every model failed; `models` is never empty
+        assert error is not None
+        raise error
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        # The timeout (and hedging) applies to the first chunk, which is read on
+        # a worker thread; once a model has started answering, its stream is
+        # consumed to the end
+        error: Exception | None = None
+        for index in range(len(self.models)):
+            try:
+                first, stream = self._run_with_policy(
+                    index,
+                    partial(self._attempt_stream, index, messages, stop=stop, **kwargs),
+                    self._latency_key(index, True),
+                )
+            except Exception as exc:
+                self._record_failure(index, exc)
+                error = exc
+                continue
+            if index > 0:
+                metrics.increment(self._metric(index, "fallbacks"))
+            if first is None:
+                return
+            yield ChatGenerationChunk(message=first)
+            for chunk in stream:
+                yield ChatGenerationChunk(message=chunk)
+            return
+        # Every model failed; `models` is never empty
+        assert error is not None
+        raise error
+
+    # --- Async path (used by the API's main agent runs) ---
+
+    async def _aattempt(self, index: int, messages: list[BaseMessage], **kwargs: Any):
+        start = time.monotonic()
+        result = await self.models[index].ainvoke(messages, _INNER_CONFIG, **kwargs)
+        self.tracker.record(self._latency_key(index, False), time.monotonic() - start)
+        return result
+
+    async def _aattempt_stream(
+        self, index: int, messages: list[BaseMessage], **kwargs: Any
+    ):
+        start = time.monotonic()
+        stream = self.models[index].astream(messages, _INNER_CONFIG, **kwargs)
+        try:
+            first = await stream.__anext__()
+        except StopAsyncIteration:
+            first = None
+        self.tracker.record(self._latency_key(index, True), time.monotonic() - start)
+        return first, stream
+
+    async def _arun_with_policy(self, index: int, attempt, latency_key: str):
+        """Await `attempt()` with the timeout and hedging policy."""
+        metrics.increment(self._metric(index, "calls"))
+        primary = asyncio.create_task(attempt())
+        tasks = {primary}
+        try:
+            async with asyncio.timeout(self.timeout):
+                hedge_delay = self._hedge_delay(latency_key)
+                if hedge_delay is not None:
+                    done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                    if not done:
+                        metrics.increment(self._metric(index, "hedges"))
+                        tasks.add(asyncio.create_task(attempt()))
+
+                pending = set(tasks)
+                error: BaseException | None = None
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        error = task.exception()
+                        if error is None:
+                            if task is not primary:
+                                metrics.increment(self._metric(index, "hedge_wins"))
+                            return task.result()
+                # Every attempt finished, and failed
+                assert error is not None
+                raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        error: Exception | None = None
+        for index in range(len(self.models)):
+            try:
+                message = await self._arun_with_policy(
+                    index,
+                    partial(self._aattempt, index, messages, stop=stop, **kwargs),
+                    self._latency_key(index, False),
+                )
+            except Exception as exc:
+                self._record_failure(index, exc)
+                error = exc
+                continue
+            if index > 0:
+                metrics.increment(self._metric(index, "fallbacks"))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        # Every model failed; `models` is never empty
+        assert error is not None
+        raise error
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        # The timeout (and hedging) bounds the wait for the first chunk; once a
+        # model has started answering, its stream is consumed to the end
+        error: Exception | None = None
+        for index in range(len(self.models)):
+            try:
+                first, stream = await self._arun_with_policy(
+                    index,
+                    partial(
+                        self._aattempt_stream, index, messages, stop=stop, **kwargs
+                    ),
+                    self._latency_key(index, True),
+                )
+            except Exception as exc:
+                self._record_failure(index, exc)
+                error = exc
+                continue
+            if index > 0:
+                metrics.increment(self._metric(index, "fallbacks"))
+            if first is None:
+                return
+            yield ChatGenerationChunk(message=first)
+            async for chunk in stream:
+                yield ChatGenerationChunk(message=chunk)
+            return
+        # Every model failed; `models` is never empty
+        assert error is not None
+        raise error
+
+
+def create_resilient_model(models: dict[str, BaseChatModel]) -> ResilientChatModel:
+    """Wrap models with the configured timeout, hedging and failover policy.
+
+    Args:
+        models: Mapping of model name to model, primary first, then fallbacks
+
+    Returns:
+        The wrapped model
+    """
+    return ResilientChatModel(
+        models=list(models.values()),
+        model_names=list(models.keys()),
+        timeout=settings.LLM_TIMEOUT,
+        hedge_percentile=(
+            settings.LLM_HEDGE_PERCENTILE if settings.LLM_HEDGE_ENABLED else None
+        ),
+        hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+    )
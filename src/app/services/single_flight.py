@@ -0,0 +1,64 @@
+"""Single-flight call coalescing.
+
+Concurrent runs (and parallel sub-agents within one run) often issue the same
+upstream request at the same moment. A `SingleFlight` group lets the first
+caller for a key perform the call while later callers with the same key wait
+for, and share, its result. Nothing is cached once the call has finished.
+
+Tools execute in worker threads, so coalescing is thread-based.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable, TypeVar
+
+from app.services.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share the same key.
+
+    Args:
+        name: Name used to label the `single_flight.<name>.*` counters
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run `fn` for `key`, or wait for the identical call already in flight.
+
+        Args:
+            key: Identity of the upstream request
+            fn: Zero-argument callable performing the request
+
+        Returns:
+            The result of the single upstream call; exceptions are re-raised
+            in every waiter
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                future: Future = Future()
+                self._in_flight[key] = future
+
+        if in_flight is not None:
+            metrics.increment(f"single_flight.{self.name}.coalesced")
+            return in_flight.result()
+
+        metrics.increment(f"single_flight.{self.name}.calls")
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
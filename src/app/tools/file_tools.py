@@ -15,9 +15,11 @@ from langgraph.types import Command
 from app.prompts.prompts import (
     LS_DESCRIPTION,
     READ_FILE_DESCRIPTION,
+    SEARCH_FILES_DESCRIPTION,
     WRITE_FILE_DESCRIPTION,
 )
 from app.models.state import DeepAgentState
+from app.services.file_index import file_index
 
 
 @tool(description=LS_DESCRIPTION)
@@ -87,6 +89,7 @@ def write_file(
     """
     files = state.get("files", {})
     files[file_path] = content
+    file_index.add(content)
     return Command(
         update={
             "files": files,
@@ -95,3 +98,34 @@ def write_file(
             ],
         }
     )
+
+
+@tool(description=SEARCH_FILES_DESCRIPTION, parse_docstring=True)
+def search_files(
+    query: str,
+    state: Annotated[DeepAgentState, InjectedState],
+    max_results: int = 5,
+) -> str:
+    """Search the virtual filesystem and return ranked matching lines.
+
+    Args:
+        query: Keywords describing the information to find
+        state: Agent state containing virtual filesystem (injected in tool node)
+        max_results: Maximum number of matching lines to return (default: 5)
+
+    Returns:
+        Ranked snippets with file paths and line numbers, or a message if nothing matched
+    """
+    files = state.get("files", {})
+    if not files:
+        return "No files in the virtual filesystem to search."
+
+    hits = file_index.search(files, query, max_results=max_results)
+    if not hits:
+        return f"No matches found for '{query}'"
+
+    result_lines = [f"Found {len(hits)} match(es) for '{query}':"]
+    for hit in hits:
+        snippet = hit.snippet.strip()[:300]  # Truncate long lines
+        result_lines.append(f"{hit.file_path}:{hit.line_number}\t{snippet}")
+    return "\n".join(result_lines)
@@ -13,6 +13,7 @@ from functools import lru_cache
 import httpx
 from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from langchain_core.tools import InjectedToolArg, InjectedToolCallId, tool
 from langgraph.prebuilt import InjectedState
 from langgraph.types import Command
@@ -21,14 +22,50 @@ from pydantic import BaseModel, Field
 from tavily import TavilyClient
 from typing_extensions import Annotated, Literal
 
-from app.prompts.prompts import SUMMARIZE_WEB_SEARCH
+from app.config import settings
+from app.prompts.prompts import SUMMARIZE_WEB_SEARCH, SUMMARIZE_WEB_SEARCH_BATCH
 from app.models.state import DeepAgentState
+from app.services.cancellation import raise_if_cancelled
+from app.services.file_index import file_index
+from app.services.http_client import http_clients
+from app.services.knowledge_base import KnowledgeBase
+from app.services.metrics import metrics
+from app.services.resilient_model import create_resilient_model
+from app.services.single_flight import SingleFlight
+
+# Coalesce identical searches and page fetches issued concurrently across runs
+_search_flight = SingleFlight("tavily_search")
+_fetch_flight = SingleFlight("fetch")
+
+
+def _init_summarization_model(
+    model: str, client: httpx.Client, async_client: httpx.AsyncClient
+):
+    """Initialize one summarization model, using the shared HTTP pool where supported."""
+    if model.startswith("openai:"):
+        return init_chat_model(
+            model=model, http_client=client, http_async_client=async_client
+        )
+    return init_chat_model(model=model)
+
+
+@lru_cache(maxsize=1)
+def _build_summarization_model(client: httpx.Client, async_client: httpx.AsyncClient):
+    names = [settings.SUMMARIZATION_MODEL]
+    if settings.SUMMARIZATION_FALLBACK_MODEL:
+        names.append(settings.SUMMARIZATION_FALLBACK_MODEL)
+    return create_resilient_model(
+        {name: _init_summarization_model(name, client, async_client) for name in names}
+    )
 
 
-@lru_cache
 def get_summarization_model():
-    """Returns a cached instance of the summarization model."""
-    return init_chat_model(model="openai:gpt-4o-mini")
+    """Returns a cached instance of the summarization model.
+
+    The cache is keyed on the shared HTTP clients, so the model is rebuilt when
+    the app lifespan closes and recreates them.
+    """
+    return _build_summarization_model(http_clients.client, http_clients.async_client)
 
 
 @lru_cache
@@ -37,6 +74,18 @@ def get_tavily_client():
     return TavilyClient()
 
 
+@lru_cache
+def get_knowledge_base() -> KnowledgeBase | None:
+    """Returns a cached instance of the local knowledge base, if enabled."""
+    if not settings.KNOWLEDGE_BASE_ENABLED:
+        return None
+    return KnowledgeBase(
+        settings.KNOWLEDGE_BASE_PATH,
+        min_term_coverage=settings.KNOWLEDGE_BASE_MIN_TERM_COVERAGE,
+        min_score=settings.KNOWLEDGE_BASE_MIN_SCORE,
+    )
+
+
 class Summary(BaseModel):
     """Schema for webpage content summarization."""
 
@@ -44,10 +93,31 @@ class Summary(BaseModel):
     summary: str = Field(description="Key learnings from the webpage.")
 
 
+class IndexedSummary(Summary):
+    """Summary of one webpage in a batch, tagged with the webpage's index."""
+
+    index: int = Field(description="Index of the summarized webpage's tag.")
+
+
+class SummaryBatch(BaseModel):
+    """Schema for summarizing several webpages in a single call."""
+
+    summaries: list[IndexedSummary] = Field(
+        description="One summary per webpage, each with the index of its webpage."
+    )
+
+
 class TavilySearchArgs(BaseModel):
     """Pydantic model for Tavily search arguments."""
 
-    query: str = Field(description="Search query to execute")
+    queries: list[str] = Field(
+        description=(
+            "Search queries to execute concurrently. Pass several distinct queries "
+            "to cover different angles of a topic in a single call."
+        ),
+        min_length=1,
+        max_length=5,
+    )
 
 
 def get_today_str() -> str:
@@ -61,19 +131,45 @@ def run_tavily_search(
     topic: Literal["general", "news", "finance"] = "general",
     include_raw_content: bool = True,
 ) -> dict:
-    """Perform search using Tavily API for a single query."""
+    """Perform search using Tavily API for a single query.
+
+    Identical searches already in flight are shared rather than repeated.
+    """
     tavily_client = get_tavily_client()
-    result = tavily_client.search(
-        search_query,
-        max_results=max_results,
-        include_raw_content=include_raw_content,
-        topic=topic,
+    result = _search_flight.do(
+        (search_query, max_results, topic, include_raw_content),
+        lambda: tavily_client.search(
+            search_query,
+            max_results=max_results,
+            include_raw_content=include_raw_content,
+            topic=topic,
+        ),
     )
     return result
 
 
-def summarize_webpage_content(webpage_content: str) -> Summary:
-    """Summarize webpage content using the configured summarization model."""
+def fetch_webpage_markdown(url: str) -> str:
+    """Fetch a webpage through the shared HTTP client and convert it to markdown.
+
+    Identical fetches already in flight are shared rather than repeated.
+    """
+
+    def _fetch() -> str:
+        with http_clients.host_slot(url):
+            response = http_clients.client.get(url, timeout=4.0)
+        response.raise_for_status()
+        return markdownify(response.text)
+
+    return _fetch_flight.do(url, _fetch)
+
+
+def summarize_webpage_content(webpage_content: str) -> Summary | None:
+    """Summarize webpage content using the configured summarization model.
+
+    Returns:
+        The summary, or None if the summarization call failed
+    """
+    metrics.increment("summarization.llm_calls")
     try:
         summarization_model = get_summarization_model()
         structured_model = summarization_model.with_structured_output(Summary)
@@ -88,41 +184,207 @@ def summarize_webpage_content(webpage_content: str) -> Summary:
         )
         return summary_and_filename
     except Exception:
-        return Summary(
-            filename="search_result.md",
-            summary=(
-                webpage_content[:1000] + "..."
-                if len(webpage_content) > 1000
-                else webpage_content
-            ),
+        metrics.increment("summarization.failures")
+        return None
+
+
+def fallback_summary(webpage_content: str) -> Summary:
+    """Stand-in summary (the start of the page) used when summarization failed."""
+    return Summary(
+        filename="search_result.md",
+        summary=(
+            webpage_content[:1000] + "..."
+            if len(webpage_content) > 1000
+            else webpage_content
+        ),
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in a text (about 4 characters each)."""
+    return len(text) // 4
+
+
+def summarize_webpage_batch(webpage_contents: list[str]) -> list[Summary] | None:
+    """Summarize several small webpages with one structured LLM call.
+
+    Summaries are matched to webpages by the index the model echoes back, not by
+    position, so a reordered answer cannot attach a summary to the wrong URL.
+
+    Returns:
+        One summary per webpage, in input order, or None if the call failed or
+        did not return exactly one summary for each webpage index
+    """
+    metrics.increment("summarization.llm_calls")
+    webpages = "\n\n".join(
+        f'<webpage index="{i}">\n{content}\n</webpage>'
+        for i, content in enumerate(webpage_contents, 1)
+    )
+    try:
+        summarization_model = get_summarization_model()
+        structured_model = summarization_model.with_structured_output(SummaryBatch)
+        batch = structured_model.invoke(
+            [
+                HumanMessage(
+                    content=SUMMARIZE_WEB_SEARCH_BATCH.format(
+                        count=len(webpage_contents),
+                        webpages=webpages,
+                        date=get_today_str(),
+                    )
+                )
+            ]
         )
+    except Exception:
+        return None
+    by_index = {item.index: item for item in batch.summaries}
+    if len(batch.summaries) != len(webpage_contents) or set(by_index) != set(
+        range(1, len(webpage_contents) + 1)
+    ):
+        metrics.increment("summarization.batch_mismatches")
+        return None
+    return [
+        Summary(filename=by_index[i].filename, summary=by_index[i].summary)
+        for i in range(1, len(webpage_contents) + 1)
+    ]
 
 
-def process_search_results(results: dict) -> list[dict]:
-    """Process search results by summarizing content where available."""
-    processed_results = []
-    HTTPX_CLIENT = httpx.Client()
+def summarize_webpage_contents(webpage_contents: list[str]) -> list[Summary | None]:
+    """Summarize many webpages, packing small ones into shared LLM calls.
+
+    Pages larger than the small-page threshold are summarized on their own.
+    Small pages are grouped under the batch token budget and summarized together;
+    if a batched call fails, its pages fall back to one call each.
+
+    Returns:
+        One summary per webpage, in input order (None where summarization failed)
+    """
+    batches = []
+    batch: list[int] = []
+    batch_tokens = 0
+    for i, content in enumerate(webpage_contents):
+        tokens = estimate_tokens(content)
+        if tokens > settings.SUMMARIZATION_SMALL_PAGE_TOKENS:
+            batches.append([i])
+            continue
+        if batch and batch_tokens + tokens > settings.SUMMARIZATION_BATCH_TOKEN_BUDGET:
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(i)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+
+    summaries: list[Summary | None] = [None] * len(webpage_contents)
+    for indices in batches:
+        raise_if_cancelled("summarizations")
+        batch_summaries = None
+        if len(indices) > 1:
+            batch_summaries = summarize_webpage_batch(
+                [webpage_contents[i] for i in indices]
+            )
+        if batch_summaries is not None:
+            metrics.increment("summarization.calls_saved", len(indices) - 1)
+            for i, summary_obj in zip(indices, batch_summaries):
+                summaries[i] = summary_obj
+            continue
+        if len(indices) > 1:
+            metrics.increment("summarization.batch_fallbacks")
+        for i in indices:
+            raise_if_cancelled("summarizations")
+            summaries[i] = summarize_webpage_content(webpage_contents[i])
+    return summaries
+
+
+def unique_filename(filename: str) -> str:
+    """Append a short random suffix to a filename to avoid collisions."""
+    uid = base64.urlsafe_b64encode(uuid.uuid4().bytes).rstrip(b"=").decode("ascii")[:8]
+    name, ext = os.path.splitext(filename)
+    return f"{name}_{uid}{ext}"
+
+
+def lookup_knowledge_base(
+    query: str, topic: str, max_results: int
+) -> list[dict] | None:
+    """Answer a search from the local knowledge base when it holds enough fresh pages.
+
+    Returns:
+        Processed results in the same shape as `process_search_results`, or None
+        if the knowledge base is disabled or cannot fully answer the query
+    """
+    knowledge_base = get_knowledge_base()
+    if knowledge_base is None:
+        return None
+    documents = knowledge_base.lookup(
+        query,
+        topic=topic,
+        max_results=max_results,
+        max_age_seconds=settings.KNOWLEDGE_BASE_MAX_AGE_HOURS * 3600,
+    )
+    if len(documents) < max_results:
+        metrics.increment("knowledge_base.misses")
+        return None
+    metrics.increment("knowledge_base.hits")
+    return [
+        {
+            "url": document.url,
+            "title": document.title,
+            "summary": document.summary,
+            "filename": unique_filename(document.filename),
+            "raw_content": document.raw_content,
+        }
+        for document in documents
+    ]
+
+
+def process_search_results(results: dict, topic: str = "general") -> list[dict]:
+    """Process search results by summarizing content where available.
+
+    All pages are fetched first so that small pages can share summarization calls.
+    Pages that were fetched and summarized by the model are saved to the local
+    knowledge base under the search topic; pages whose summarization failed get
+    a truncated stand-in summary that is not persisted.
+    """
+    fetched = []
     for result in results.get("results", []):
-        url = result["url"]
+        # Stop fetching as soon as the run is cancelled (e.g. client disconnect)
+        raise_if_cancelled("fetches")
         try:
-            response = HTTPX_CLIENT.get(url, timeout=4.0)
-            response.raise_for_status()
-            raw_content = markdownify(response.text)
-            summary_obj = summarize_webpage_content(raw_content)
+            raw_content = fetch_webpage_markdown(result["url"])
         except (httpx.RequestError, httpx.HTTPStatusError):
+            raw_content = None
+        fetched.append((result, raw_content))
+
+    summaries = iter(
+        summarize_webpage_contents(
+            [raw_content for _, raw_content in fetched if raw_content is not None]
+        )
+    )
+    processed_results = []
+    knowledge_base = get_knowledge_base()
+    for result, raw_content in fetched:
+        query = result.get("query", results.get("query", ""))
+        if raw_content is not None:
+            summary_obj = next(summaries)
+            if summary_obj is None:
+                summary_obj = fallback_summary(raw_content)
+            elif knowledge_base is not None:
+                knowledge_base.store(
+                    url=result["url"],
+                    topic=topic,
+                    title=result["title"],
+                    filename=summary_obj.filename,
+                    summary=summary_obj.summary,
+                    raw_content=raw_content,
+                    query=query,
+                )
+        else:
             raw_content = result.get("raw_content", "")
             summary_obj = Summary(
                 filename="URL_error.md",
                 summary=result.get("content", "Error reading URL; try another search."),
             )
 
-        uid = (
-            base64.urlsafe_b64encode(uuid.uuid4().bytes)
-            .rstrip(b"=")
-            .decode("ascii")[:8]
-        )
-        name, ext = os.path.splitext(summary_obj.filename)
-        summary_obj.filename = f"{name}_{uid}{ext}"
+        summary_obj.filename = unique_filename(summary_obj.filename)
         processed_results.append(
             {
                 "url": result["url"],
@@ -130,11 +392,70 @@ def process_search_results(results: dict) -> list[dict]:
                 "summary": summary_obj.summary,
                 "filename": summary_obj.filename,
                 "raw_content": raw_content,
+                "query": query,
             }
         )
     return processed_results
 
 
+def run_multi_query_search(
+    queries: list[str],
+    max_results: int = 1,
+    topic: Literal["general", "news", "finance"] = "general",
+) -> list[dict]:
+    """Search several queries at once and process each distinct URL only once.
+
+    Queries answered by the local knowledge base skip the web search. The rest
+    are sent to Tavily concurrently, and results are deduplicated by URL across
+    queries before any page is fetched or summarized.
+
+    Returns:
+        Processed results, each tagged with the query that produced it
+    """
+    processed_results = []
+    seen_urls = set()
+    pending_queries = []
+    for query in queries:
+        stored_results = lookup_knowledge_base(query, topic, max_results)
+        if stored_results is None:
+            pending_queries.append(query)
+            continue
+        for result in stored_results:
+            if result["url"] not in seen_urls:
+                seen_urls.add(result["url"])
+                processed_results.append({**result, "query": query})
+
+    if not pending_queries:
+        return processed_results
+
+    # Worker threads inherit the run's context (e.g. its cancellation scope)
+    with ContextThreadPoolExecutor(max_workers=len(pending_queries)) as executor:
+        search_results = list(
+            executor.map(
+                lambda query: run_tavily_search(
+                    query,
+                    max_results=max_results,
+                    topic=topic,
+                    include_raw_content=True,
+                ),
+                pending_queries,
+            )
+        )
+
+    unique_results = []
+    for query, results in zip(pending_queries, search_results):
+        for result in results.get("results", []):
+            if result["url"] in seen_urls:
+                metrics.increment("tavily_search.duplicate_urls_skipped")
+                continue
+            seen_urls.add(result["url"])
+            unique_results.append({**result, "query": query})
+    processed_results.extend(
+        process_search_results({"results": unique_results}, topic=topic)
+    )
+    return processed_results
+
+
 # Explicitly define the tool's schema instead of parsing the docstring
 @tool(
     args_schema=TavilySearchArgs,
@@ -145,7 +466,7 @@ def process_search_results(results: dict) -> list[dict]:
     ),
 )
 def tavily_search(
-    query: str,
+    queries: list[str],
     state: Annotated[DeepAgentState, InjectedState],
     tool_call_id: Annotated[str, InjectedToolCallId],
     max_results: Annotated[int, InjectedToolArg] = 1,
@@ -153,20 +474,22 @@ def tavily_search(
         Literal["general", "news", "finance"], InjectedToolArg
     ] = "general",
 ) -> Command:
-    search_results = run_tavily_search(
-        query, max_results=max_results, topic=topic, include_raw_content=True
+    queries = list(dict.fromkeys(queries))  # Drop repeated queries, keep order
+    processed_results = run_multi_query_search(
+        queries, max_results=max_results, topic=topic
     )
-    processed_results = process_search_results(search_results)
     files = state.get("files", {})
     saved_files = []
     summaries = []
     for result in processed_results:
         filename = result["filename"]
-        file_content = f"# Search Result: {result['title']}\n\n**URL:** {result['url']}\n**Query:** {query}\n**Date:** {get_today_str()}\n\n## Summary\n{result['summary']}\n\n## Raw Content\n{result['raw_content'] or 'No raw content available'}"
+        file_content = f"# Search Result: {result['title']}\n\n**URL:** {result['url']}\n**Query:** {result['query']}\n**Date:** {get_today_str()}\n\n## Summary\n{result['summary']}\n\n## Raw Content\n{result['raw_content'] or 'No raw content available'}"
         files[filename] = file_content
+        file_index.add(file_content)
         saved_files.append(filename)
         summaries.append(f"- {filename}: {result['summary']}...")
-    summary_text = f"🔍 Found {len(processed_results)} result(s) for '{query}':\n\n{chr(10).join(summaries)}\n\nFiles: {', '.join(saved_files)}\n💡 Use read_file() to access full details when needed."
+    query_list = ", ".join(f"'{query}'" for query in queries)
+    summary_text = f"🔍 Found {len(processed_results)} result(s) for {query_list}:\n\n{chr(10).join(summaries)}\n\nFiles: {', '.join(saved_files)}\n💡 Use read_file() to access full details when needed."
     return Command(
         update={
             "files": files,
@@ -9,6 +9,7 @@ from typing import Annotated, NotRequired
 from typing_extensions import TypedDict
 
 from langchain_core.messages import ToolMessage
+from langchain_core.runnables.config import ensure_config, merge_configs
 from langchain_core.tools import BaseTool, InjectedToolCallId, tool
 from langgraph.prebuilt import InjectedState, create_react_agent
 from langgraph.types import Command
@@ -95,8 +96,19 @@ def _create_task_tool(tools, subagents: list[SubAgent], model, state_schema):
         sub_agent_state = state.copy()
         sub_agent_state["messages"] = [("user", description)]
 
+        # Tag the sub-run so its LLM token and tool events, which flow into the
+        # parent's event stream through the inherited callbacks, can be attributed
+        sub_agent_config = merge_configs(
+            ensure_config(),
+            {
+                "run_name": subagent_type,
+                "tags": [f"subagent:{subagent_type}"],
+                "metadata": {"subagent_name": subagent_type, "task_id": tool_call_id},
+            },
+        )
+
         # Execute the sub-agent in isolation
-        result = sub_agent.invoke(sub_agent_state)
+        result = sub_agent.invoke(sub_agent_state, sub_agent_config)
 
         # Return results to parent agent via Command state update
         return Command(
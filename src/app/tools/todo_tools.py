@@ -2,10 +2,12 @@
 
 This module provides tools for creating and managing structured task lists
 that enable agents to plan complex workflows and track progress through
-multi-step operations.
+multi-step operations. Besides writing a whole plan, todos can be added,
+updated and removed by id, so each planning step only sends (and echoes back)
+what changed.
 """
 
-from typing import Annotated
+from typing import Annotated, Literal, Optional
 
 from langchain_core.messages import ToolMessage
 from langchain_core.tools import InjectedToolCallId, tool
@@ -14,14 +16,14 @@ from langgraph.types import Command
 
 # Updated import paths to reflect the new project structure
 from app.prompts.prompts import WRITE_TODOS_DESCRIPTION
-from app.models.state import DeepAgentState, Todo
+from app.models.state import DeepAgentState, Todo, with_todo_ids
 
 
 @tool(description=WRITE_TODOS_DESCRIPTION, parse_docstring=True)
 def write_todos(
     todos: list[Todo], tool_call_id: Annotated[str, InjectedToolCallId]
 ) -> Command:
-    """Create or update the agent's TODO list for task planning and tracking.
+    """Create or replace the agent's TODO list for task planning and tracking.
 
     Args:
         todos: List of Todo items with content and status
@@ -30,11 +32,108 @@ def write_todos(
     Returns:
         Command to update agent state with new TODO list
     """
+    todos = with_todo_ids(todos)
+    ids = ", ".join(todo["id"] for todo in todos)
     return Command(
         update={
             "todos": todos,
             "messages": [
-                ToolMessage(f"Updated todo list to {todos}", tool_call_id=tool_call_id)
+                ToolMessage(
+                    f"Set {len(todos)} todos with ids: {ids}", tool_call_id=tool_call_id
+                )
+            ],
+        }
+    )
+
+
+@tool(parse_docstring=True)
+def add_todos(
+    contents: list[str], tool_call_id: Annotated[str, InjectedToolCallId]
+) -> Command:
+    """Add pending tasks to the end of the TODO list.
+
+    Args:
+        contents: Descriptions of the tasks to add, in order
+        tool_call_id: Injected tool call identifier for message tracking
+
+    Returns:
+        Command adding the new todos to agent state
+    """
+    todos = with_todo_ids([{"content": c, "status": "pending"} for c in contents])
+    ids = ", ".join(todo["id"] for todo in todos)
+    return Command(
+        update={
+            "todos": {"add": todos},
+            "messages": [
+                ToolMessage(
+                    f"Added {len(todos)} todos with ids: {ids}",
+                    tool_call_id=tool_call_id,
+                )
+            ],
+        }
+    )
+
+
+@tool(parse_docstring=True)
+def update_todo(
+    todo_id: str,
+    status: Literal["pending", "in_progress", "completed"],
+    state: Annotated[DeepAgentState, InjectedState],
+    tool_call_id: Annotated[str, InjectedToolCallId],
+    content: Optional[str] = None,
+) -> Command | str:
+    """Change the status (and optionally the description) of one task by id.
+
+    Args:
+        todo_id: Id of the todo to update
+        status: New status - pending, in_progress, or completed
+        state: Injected agent state containing the current TODO list
+        tool_call_id: Injected tool call identifier for message tracking
+        content: New description of the task, if it changed
+
+    Returns:
+        Command updating the todo in agent state, or an error message
+    """
+    if todo_id not in {todo.get("id") for todo in state.get("todos", [])}:
+        return f"Error: Todo '{todo_id}' not found"
+    fields: dict[str, str] = {"status": status}
+    if content is not None:
+        fields["content"] = content
+    return Command(
+        update={
+            "todos": {"update": {todo_id: fields}},
+            "messages": [
+                ToolMessage(f"Todo {todo_id} is {status}", tool_call_id=tool_call_id)
+            ],
+        }
+    )
+
+
+@tool(parse_docstring=True)
+def remove_todos(
+    todo_ids: list[str],
+    state: Annotated[DeepAgentState, InjectedState],
+    tool_call_id: Annotated[str, InjectedToolCallId],
+) -> Command | str:
+    """Remove tasks that are no longer relevant from the TODO list.
+
+    Args:
+        todo_ids: Ids of the todos to remove
+        state: Injected agent state containing the current TODO list
+        tool_call_id: Injected tool call identifier for message tracking
+
+    Returns:
+        Command removing the todos from agent state, or an error message
+    """
+    known = {todo.get("id") for todo in state.get("todos", [])}
+    missing = [todo_id for todo_id in todo_ids if todo_id not in known]
+    if missing:
+        return f"Error: Todos not found: {', '.join(missing)}"
+    return Command(
+        update={
+            "todos": {"remove": todo_ids},
+            "messages": [
+                ToolMessage(f"Removed {len(todo_ids)} todos", tool_call_id=tool_call_id)
             ],
         }
     )
@@ -62,9 +161,11 @@ def read_todos(
         return "No todos currently in the list."
 
     result = "Current TODO List:\n"
-    for i, todo in enumerate(todos, 1):
+    for todo in todos:
         status_emoji = {"pending": "⏳", "in_progress": "🔄", "completed": "✅"}
         emoji = status_emoji.get(todo["status"], "❓")
-        result += f"{i}. {emoji} {todo['content']} ({todo['status']})\n"
+        result += (
+            f"[{todo.get('id', '?')}] {emoji} {todo['content']} ({todo['status']})\n"
+        )
 
     return result.strip()
@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+# Settings require API keys at import time; tests never call the real services
+os.environ.setdefault("TAVILY_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+# Keep on-disk stores out of the working tree
+_data_dir = tempfile.mkdtemp(prefix="deep-agent-tests-")
+os.environ.setdefault("FILE_STORE_PATH", os.path.join(_data_dir, "files"))
+os.environ.setdefault(
+    "KNOWLEDGE_BASE_PATH", os.path.join(_data_dir, "knowledge_base.sqlite3")
+)
+os.environ.setdefault("PROFILE_STORE_PATH", os.path.join(_data_dir, "profiles"))
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import admin
+from app.config import settings
+from app.main import app
+
+TOKEN = "test-admin-token"
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", TOKEN)
+    monkeypatch.setattr(settings, "PROFILE_STORE_PATH", str(tmp_path))
+    with TestClient(app) as client:
+        yield client
+
+
+def test_admin_endpoints_are_hidden_without_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    with TestClient(app) as client:
+        response = client.get("/admin/profile", params={"seconds": 0.1})
+    assert response.status_code == 404
+
+
+def test_request_profile_is_stored_on_disk(client, tmp_path):
+    response = client.get(
+        "/health", headers={"X-Admin-Token": TOKEN, "X-Profile-Request": "cpu"}
+    )
+    profile_id = response.headers["X-Profile-Id"]
+
+    # Another worker serves it from the shared directory
+    assert os.path.exists(tmp_path / profile_id)
+    profile = client.get(
+        f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": TOKEN}
+    )
+    assert profile.status_code == 200
+
+
+def test_unknown_or_malformed_profile_ids_are_not_found(client):
+    for profile_id in ["0" * 32, "..%2F..%2Fetc%2Fpasswd"]:
+        response = client.get(
+            f"/admin/profiles/{profile_id}", headers={"X-Admin-Token": TOKEN}
+        )
+        assert response.status_code == 404
+
+
+def test_only_recent_profiles_are_kept(client, tmp_path):
+    ids = [f"{i:032x}" for i in range(admin.MAX_STORED_PROFILES + 5)]
+    for i, profile_id in enumerate(ids):
+        admin.save_request_profile(profile_id, "stack 1")
+        os.utime(tmp_path / profile_id, (i, i))
+
+    admin.save_request_profile("f" * 32, "stack 1")
+
+    assert len(os.listdir(tmp_path)) == admin.MAX_STORED_PROFILES
+    assert admin.load_request_profile("f" * 32) == "stack 1"
+    assert admin.load_request_profile(ids[0]) is None
+
+
+def test_worker_profile_with_memory(client):
+    response = client.get(
+        "/admin/profile",
+        params={"seconds": 0.2, "memory": True},
+        headers={"X-Admin-Token": TOKEN},
+    )
+    assert response.status_code == 200
+    assert "tracemalloc top allocations" in response.text
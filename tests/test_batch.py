@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+from app.api import routes
+from app.api.models import BatchInvokeRequest
+
+
+class CountingAgent:
+    """Stand-in for the agent graph that records concurrency and run configs."""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.configs = []
+
+    async def ainvoke(self, agent_input, config):
+        self.configs.append(config)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if agent_input["messages"][0] == ("user", "fail"):
+            raise ValueError("boom")
+        return {"messages": [], "files": {}, "todos": []}
+
+
+def run_batch(request: BatchInvokeRequest) -> list[dict]:
+    agent_inputs = [routes.build_agent_input(item) for item in request.requests]
+
+    async def collect():
+        return [
+            json.loads(line)
+            async for line in routes.batch_generator(request, agent_inputs)
+        ]
+
+    return asyncio.run(collect())
+
+
+def test_batch_limit_does_not_leak_into_run_config(monkeypatch):
+    agent = CountingAgent()
+    monkeypatch.setattr(routes, "agent_executor", agent)
+    request = BatchInvokeRequest(
+        requests=[{"messages": [{"role": "user", "content": "hi"}]}] * 6,
+        max_concurrency=2,
+    )
+
+    results = run_batch(request)
+
+    assert sorted(result["index"] for result in results) == list(range(6))
+    assert agent.peak == 2
+    assert all("max_concurrency" not in config for config in agent.configs)
+
+
+def test_batch_reports_item_errors(monkeypatch):
+    monkeypatch.setattr(routes, "agent_executor", CountingAgent())
+    request = BatchInvokeRequest(
+        requests=[
+            {"messages": [{"role": "user", "content": "hi"}]},
+            {"messages": [{"role": "user", "content": "fail"}]},
+        ]
+    )
+
+    results = {result["index"]: result for result in run_batch(request)}
+
+    assert "response" in results[0]
+    assert results[1]["error"] == "boom"
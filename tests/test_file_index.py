@@ -0,0 +1,43 @@
+from app.services.file_index import FileIndex, IndexedFile
+
+
+def test_search_ranks_matching_lines():
+    files = {
+        "notes.md": "intro\nthe quantum computing roadmap\nunrelated line\n",
+        "other.md": "quantum\nnothing here\n",
+    }
+
+    hits = FileIndex().search(files, "quantum roadmap", max_results=5)
+
+    assert [(hit.file_path, hit.line_number) for hit in hits] == [
+        ("notes.md", 2),
+        ("other.md", 1),
+    ]
+    assert hits[0].snippet == "the quantum computing roadmap"
+    assert hits[0].score > hits[1].score
+
+
+def test_search_without_matches_returns_nothing():
+    assert FileIndex().search({"a.md": "alpha beta"}, "gamma") == []
+    assert FileIndex().search({"a.md": "alpha beta"}, "  ") == []
+
+
+def test_postings_only_hold_lines_containing_the_term():
+    entry = IndexedFile.build("a b a\nb c\n\nc c c")
+
+    assert entry.postings["a"] == [(0, 2)]
+    assert entry.postings["c"] == [(1, 1), (3, 3)]
+    assert entry.num_docs == 3
+    assert entry.total_length == 8
+
+
+def test_cache_is_bounded_by_size_and_reuses_entries():
+    contents = [f"document {i} " + "word " * 50 for i in range(20)]
+    size = IndexedFile.build(contents[0]).size_bytes
+    index = FileIndex(max_bytes=size * 5)
+
+    entries = [index.add(content) for content in contents]
+
+    assert len(index._entries) <= 5
+    assert index._size_bytes <= index.max_bytes
+    assert index.add(contents[-1]) is entries[-1]
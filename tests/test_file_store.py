@@ -0,0 +1,79 @@
+import asyncio
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.config import settings
+from app.services.file_store import FileStore, file_store
+
+
+def test_prune_deletes_only_stale_files(tmp_path):
+    store = FileStore(str(tmp_path))
+    old, new = store.put("old body"), store.put("new body")
+    stale = time.time() - 2 * 3600
+    os.utime(store._blob_path(old), (stale, stale))
+
+    assert store.prune(3600) == 1
+    assert store.get(old) is None
+    assert store.get(new) == "new body"
+
+
+def test_stores_are_pruned_periodically(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "prune_stores", lambda: calls.append(time.monotonic()))
+    monkeypatch.setattr(settings, "STORE_PRUNE_INTERVAL_MINUTES", 0.05 / 60)
+
+    async def run_briefly():
+        task = asyncio.create_task(main.prune_stores_periodically())
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(run_briefly())
+
+    assert len(calls) >= 3
+
+
+def test_unknown_file_refs_are_rejected():
+    with TestClient(main.app) as client:
+        response = client.post(
+            "/api/v1/invoke",
+            json={
+                "messages": [{"role": "user", "content": "hi"}],
+                "file_refs": {"notes.md": "0" * 64},
+            },
+        )
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["missing_hashes"] == ["0" * 64]
+
+
+def test_reading_a_file_keeps_it_from_being_pruned(tmp_path):
+    store = FileStore(str(tmp_path))
+    digest = store.put("referenced body")
+    stale = time.time() - 2 * 3600
+    os.utime(store._blob_path(digest), (stale, stale))
+
+    assert store.get(digest) == "referenced body"
+    assert store.prune(3600) == 0
+
+
+def test_conditional_get_of_unknown_file_is_not_found():
+    etag = '"' + "0" * 64 + '"'
+    with TestClient(main.app) as client:
+        response = client.get(
+            f"/api/v1/files/{'0' * 64}", headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 404
+
+
+def test_conditional_get_of_stored_file_is_not_modified():
+    digest = file_store.put("cached body")
+    with TestClient(main.app) as client:
+        response = client.get(
+            f"/api/v1/files/{digest}", headers={"If-None-Match": f'"{digest}"'}
+        )
+
+    assert response.status_code == 304
@@ -0,0 +1,91 @@
+import asyncio
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.http_client import http_clients
+from app.tools.research_tools import fetch_webpage_markdown, get_summarization_model
+
+PAGE = b"<html><body><h1>Title</h1><p>" + b"content " * 500 + b"</p></body></html>"
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections: set = set()
+
+    def do_GET(self):
+        self.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def page_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+def test_summarization_model_follows_client_restart():
+    http_clients.start()
+    first = get_summarization_model()
+    asyncio.run(http_clients.aclose())
+    http_clients.start()
+    second = get_summarization_model()
+
+    assert second is not first
+    clients = [getattr(model, "http_client", None) for model in second.models]
+    assert all(client is None or not client.is_closed for client in clients)
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_fetch_soak_reuses_connections(page_url):
+    PageHandler.connections.clear()
+    latencies = []
+    for i in range(300):
+        if i == 50:
+            warm_fds = open_fds()
+        start = time.perf_counter()
+        assert "Title" in fetch_webpage_markdown(f"{page_url}/page/{i}")
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    p50, p95 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+    print(f"fetch latency p50={p50 * 1000:.2f}ms p95={p95 * 1000:.2f}ms")
+
+    # Keep-alive: one connection serves every sequential fetch and no
+    # descriptors leak once the pool is warm
+    assert len(PageHandler.connections) == 1
+    assert open_fds() <= warm_fds + 1
+    assert p95 < 0.5
+
+
+def test_host_slots_are_dropped_when_idle():
+    for i in range(50):
+        with http_clients.host_slot(f"https://host-{i}.example/page"):
+            pass
+
+    with http_clients.host_slot("https://busy.example/a"):
+        with http_clients.host_slot("https://busy.example/b"):
+            assert list(http_clients._host_slots) == ["busy.example"]
+        assert http_clients._host_users == {"busy.example": 1}
+
+    assert http_clients._host_slots == {}
+    assert http_clients._host_users == {}
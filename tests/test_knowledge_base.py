@@ -0,0 +1,187 @@
+import sqlite3
+import time
+
+from app.services.knowledge_base import KnowledgeBase
+from app.tools import research_tools
+from app.tools.research_tools import Summary
+
+DAY = 24 * 3600
+
+
+def open_kb(tmp_path, **kwargs):
+    # BM25 scores in a store of one or two pages are near zero, so the tests of
+    # storage mechanics disable the score cutoff
+    kwargs.setdefault("min_score", 0.0)
+    return KnowledgeBase(str(tmp_path / "kb.sqlite3"), **kwargs)
+
+
+def store(kb, url, summary, topic="general", query="quantum computing"):
+    kb.store(
+        url=url,
+        topic=topic,
+        title="Quantum computing",
+        filename="quantum.md",
+        summary=summary,
+        raw_content="raw page about quantum computing",
+        query=query,
+    )
+
+
+def test_lookup_filters_by_topic(tmp_path):
+    kb = open_kb(tmp_path)
+    store(kb, "https://a.example", "general page", topic="general")
+    store(kb, "https://b.example", "news page", topic="news")
+
+    general = kb.lookup("quantum computing", "general", 5, DAY)
+    news = kb.lookup("quantum computing", "news", 5, DAY)
+
+    assert [doc.url for doc in general] == ["https://a.example"]
+    assert [doc.url for doc in news] == ["https://b.example"]
+    assert kb.lookup("quantum computing", "finance", 5, DAY) == []
+
+
+CORPUS = [
+    (
+        "https://asyncio.example",
+        "Python asyncio tutorial",
+        "A guide to async programming in Python with asyncio event loops, "
+        "tasks and coroutines.",
+        "python asyncio tutorial",
+    ),
+    (
+        "https://quantum.example",
+        "Quantum computing roadmap",
+        "IBM's plan for quantum processors through 2030.",
+        "quantum computing roadmap",
+    ),
+    (
+        "https://k8s.example",
+        "Kubernetes autoscaling",
+        "How the horizontal pod autoscaler scales deployments.",
+        "kubernetes autoscaling",
+    ),
+    (
+        "https://rust.example",
+        "Rust ownership",
+        "Borrow checker and lifetimes explained.",
+        "rust ownership",
+    ),
+    (
+        "https://packaging.example",
+        "Python packaging",
+        "Poetry, pip and wheels.",
+        "python packaging",
+    ),
+    (
+        "https://cooking.example",
+        "Sourdough bread",
+        "Starter, hydration and baking times.",
+        "sourdough bread",
+    ),
+]
+
+
+def store_corpus(kb):
+    for url, title, summary, query in CORPUS:
+        kb.store(
+            url=url,
+            topic="general",
+            title=title,
+            filename="page.md",
+            # Raw pages mention all sorts of things; they must not cause matches
+            summary=summary,
+            raw_content="how to write a novel, rust async, kubernetes in 2025",
+            query=query,
+        )
+
+
+def test_unrelated_queries_miss(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "kb.sqlite3"))
+    store_corpus(kb)
+
+    for query in (
+        "rust async tutorial",
+        "best practices for kubernetes in 2025",
+        "how to write a novel",
+        "the and of to",
+    ):
+        assert kb.lookup(query, "general", 1, DAY) == [], query
+
+
+def test_related_queries_hit(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "kb.sqlite3"))
+    store_corpus(kb)
+
+    (doc,) = kb.lookup("How to use Python asyncio event loops?", "general", 1, DAY)
+    assert doc.url == "https://asyncio.example"
+    (doc,) = kb.lookup("kubernetes autoscaling", "general", 1, DAY)
+    assert doc.url == "https://k8s.example"
+
+
+def test_a_single_stored_page_does_not_answer_other_queries(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "kb.sqlite3"))
+    url, title, summary, query = CORPUS[0]
+    kb.store(url, "general", title, "page.md", summary, "raw", query)
+
+    assert kb.lookup("rust async tutorial", "general", 1, DAY) == []
+
+
+def test_refreshing_a_page_replaces_its_index_entry(tmp_path):
+    kb = open_kb(tmp_path)
+    store(kb, "https://a.example", "mentions photonics")
+    store(kb, "https://a.example", "mentions superconductors")
+
+    assert kb.lookup("photonics", "general", 5, DAY) == []
+    (doc,) = kb.lookup("superconductors", "general", 5, DAY)
+    assert doc.summary == "mentions superconductors"
+
+
+def test_prune_removes_stale_pages(tmp_path, monkeypatch):
+    kb = open_kb(tmp_path)
+    monkeypatch.setattr(time, "time", lambda: 1_000_000.0)
+    store(kb, "https://old.example", "old page")
+    monkeypatch.setattr(time, "time", lambda: 1_000_000.0 + 2 * DAY)
+    store(kb, "https://new.example", "new page")
+
+    assert kb.prune(DAY) == 1
+    assert [doc.url for doc in kb.lookup("quantum", "general", 5, 10 * DAY)] == [
+        "https://new.example"
+    ]
+
+
+def test_outdated_schema_is_recreated(tmp_path):
+    path = str(tmp_path / "kb.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE documents (url TEXT PRIMARY KEY)")
+    conn.commit()
+    conn.close()
+
+    kb = KnowledgeBase(path, min_score=0.0)
+    store(kb, "https://a.example", "page")
+
+    assert len(kb.lookup("quantum", "general", 5, DAY)) == 1
+
+
+def test_failed_summaries_are_not_persisted(tmp_path, monkeypatch):
+    kb = open_kb(tmp_path)
+    monkeypatch.setattr(research_tools, "get_knowledge_base", lambda: kb)
+    monkeypatch.setattr(
+        research_tools, "fetch_webpage_markdown", lambda url: f"content of {url}"
+    )
+    monkeypatch.setattr(
+        research_tools,
+        "summarize_webpage_contents",
+        lambda contents: [Summary(filename="good.md", summary="quantum summary"), None],
+    )
+    results = {
+        "results": [
+            {"url": "https://good.example", "title": "Quantum", "query": "quantum"},
+            {"url": "https://bad.example", "title": "Quantum", "query": "quantum"},
+        ]
+    }
+
+    processed = research_tools.process_search_results(results, topic="general")
+
+    assert processed[1]["summary"] == "content of https://bad.example"
+    stored = kb.lookup("quantum", "general", 5, DAY)
+    assert [doc.url for doc in stored] == ["https://good.example"]
@@ -0,0 +1,128 @@
+import io
+import json
+import logging
+
+import pytest
+
+from app import logging_config
+from app.logging_config import SamplingFilter, request_id_var, setup_logging
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    setup_logging(stream)
+    yield stream
+    setup_logging()
+
+
+def records(stream: io.StringIO) -> list[dict]:
+    logging_config.stop_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_exceptions_keep_their_own_field(log_stream):
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("app.test").exception("failed %d", 1)
+
+    (record,) = records(log_stream)
+    assert record["message"] == "failed 1"
+    assert "ValueError: boom" in record["exc_info"]
+
+
+def test_records_are_not_formatted_on_the_calling_thread(monkeypatch):
+    def fail(*args):
+        raise AssertionError("formatted on the calling thread")
+
+    handler = logging_config.NonBlockingQueueHandler(None)
+    monkeypatch.setattr(handler, "format", fail)
+    args = ["a"]
+    record = logging.LogRecord("app", logging.INFO, "", 0, "value %s", (args,), None)
+
+    prepared = handler.prepare(record)
+    args.append("b")
+
+    assert prepared.msg == "value ['a']"
+    assert prepared.args is None
+    assert record.args == (args,)
+
+
+def test_records_carry_the_request_id(log_stream):
+    token = request_id_var.set("req-123")
+    try:
+        logging.getLogger("app.test").info("inside request")
+    finally:
+        request_id_var.reset(token)
+
+    (record,) = records(log_stream)
+    assert record["request_id"] == "req-123"
+
+
+def test_stop_flushes_a_full_queue(log_stream, monkeypatch):
+    monkeypatch.setattr(logging_config.settings, "LOG_QUEUE_SIZE", 1)
+    setup_logging(log_stream)
+    logger = logging.getLogger("app.test")
+    for i in range(200):
+        logger.warning("record %d", i)
+
+    written = records(log_stream)
+    assert written
+    assert written[-1]["message"].startswith("record")
+
+
+def test_inline_logging_writes_on_the_calling_thread(monkeypatch):
+    monkeypatch.setattr(logging_config.settings, "LOG_QUEUE_ENABLED", False)
+    stream = io.StringIO()
+    setup_logging(stream)
+    try:
+        token = request_id_var.set("req-inline")
+        try:
+            logging.getLogger("app.test").info("written %s", "inline")
+        finally:
+            request_id_var.reset(token)
+        (line,) = stream.getvalue().splitlines()
+    finally:
+        monkeypatch.undo()
+        setup_logging()
+
+    record = json.loads(line)
+    assert record["message"] == "written inline"
+    assert record["request_id"] == "req-inline"
+
+
+def make_record(name: str, level: int) -> logging.LogRecord:
+    return logging.LogRecord(name, level, "", 0, "message", None, None)
+
+
+def test_sampling_applies_to_logger_and_children_below_warning():
+    sampling = SamplingFilter({"app.main": 0.0})
+
+    assert not sampling.filter(make_record("app.main", logging.INFO))
+    assert not sampling.filter(make_record("app.main.child", logging.INFO))
+    assert sampling.filter(make_record("app.main", logging.WARNING))
+    assert sampling.filter(make_record("app.other", logging.INFO))
+
+
+def test_rate_limit_is_per_logger():
+    limiter = SamplingFilter({}, rate_limit=5)
+
+    allowed = [limiter.filter(make_record("app.a", logging.INFO)) for _ in range(20)]
+
+    assert sum(allowed) == 5
+    assert limiter.filter(make_record("app.b", logging.INFO))
+
+
+def test_rate_limit_below_one_per_second(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(logging_config.time, "monotonic", lambda: now[0])
+    limiter = SamplingFilter({}, rate_limit=0.5)
+
+    allowed = []
+    for _ in range(30):
+        allowed.append(limiter.filter(make_record("app.a", logging.INFO)))
+        now[0] += 0.1
+
+    # One record up front, then one every two seconds
+    assert sum(allowed) == 2
@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+import time
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import Field
+
+from app.services.resilient_model import LatencyTracker, ResilientChatModel
+
+
+class DelayedModel(BaseChatModel):
+    """Fake chat model that answers after a configurable delay per call."""
+
+    name: str
+    delays: list[float]
+    """Delay of each successive call; the last one repeats."""
+    calls: Any = Field(default_factory=itertools.count)
+
+    @property
+    def _llm_type(self) -> str:
+        return "delayed"
+
+    def _next_delay(self) -> tuple[int, float]:
+        call = next(self.calls)
+        return call, self.delays[min(call, len(self.delays) - 1)]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        call, delay = self._next_delay()
+        time.sleep(delay)
+        message = AIMessage(content=f"{self.name}-{call}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        call, delay = self._next_delay()
+        await asyncio.sleep(delay)
+        message = AIMessage(content=f"{self.name}-{call}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        call, delay = self._next_delay()
+        time.sleep(delay)
+        for part in (self.name, f"-{call}"):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=part))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        call, delay = self._next_delay()
+        await asyncio.sleep(delay)
+        for part in (self.name, f"-{call}"):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=part))
+
+
+def wrap(*models: DelayedModel, **options) -> ResilientChatModel:
+    return ResilientChatModel(
+        models=list(models),
+        model_names=[model.name for model in models],
+        tracker=LatencyTracker(),
+        **options,
+    )
+
+
+def slow_and_fallback() -> ResilientChatModel:
+    return wrap(
+        DelayedModel(name="slow", delays=[2.0]),
+        DelayedModel(name="fast", delays=[0.0]),
+        timeout=0.2,
+    )
+
+
+def timed(fn):
+    start = time.monotonic()
+    result = fn()
+    return result, time.monotonic() - start
+
+
+def test_invoke_fails_over_on_timeout():
+    result, elapsed = timed(lambda: slow_and_fallback().invoke("hi"))
+
+    assert result.content == "fast-0"
+    assert elapsed < 1.0
+
+
+def test_stream_fails_over_on_timeout():
+    model = slow_and_fallback()
+    chunks, elapsed = timed(lambda: list(model.stream("hi")))
+
+    assert "".join(chunk.content for chunk in chunks) == "fast-0"
+    assert elapsed < 1.0
+
+
+def test_astream_fails_over_on_timeout():
+    async def collect():
+        return [chunk async for chunk in slow_and_fallback().astream("hi")]
+
+    chunks, elapsed = timed(lambda: asyncio.run(collect()))
+
+    assert "".join(chunk.content for chunk in chunks) == "fast-0"
+    assert elapsed < 1.0
+
+
+def test_sync_invoke_under_astream_events_fails_over():
+    # Under astream_events, a sync invoke (e.g. inside a sub-agent) streams
+    model = slow_and_fallback()
+    chain = RunnableLambda(lambda text: model.invoke(text).content)
+
+    async def run():
+        output = None
+        async for event in chain.astream_events("hi", version="v2"):
+            if event["event"] == "on_chain_end":
+                output = event["data"]["output"]
+        return output
+
+    output, elapsed = timed(lambda: asyncio.run(run()))
+
+    assert output == "fast-0"
+    assert elapsed < 1.0
+
+
+def test_streams_record_first_chunk_latency():
+    model = wrap(DelayedModel(name="primary", delays=[0.01]))
+
+    list(model.stream("hi"))
+
+    assert model.tracker.percentile("primary:first_chunk", 50) is not None
+    assert model.tracker.percentile("primary", 50) is None
+
+
+def test_slow_stream_is_hedged():
+    model = wrap(
+        DelayedModel(name="primary", delays=[2.0, 0.0]),
+        hedge_percentile=50,
+        hedge_min_samples=1,
+    )
+    for _ in range(5):
+        model.tracker.record("primary:first_chunk", 0.01)
+
+    chunks, elapsed = timed(lambda: list(model.stream("hi")))
+
+    assert "".join(chunk.content for chunk in chunks) == "primary-1"
+    assert elapsed < 1.0
+
+
+def test_slow_ainvoke_is_hedged():
+    model = wrap(
+        DelayedModel(name="primary", delays=[2.0, 0.0]),
+        hedge_percentile=50,
+        hedge_min_samples=1,
+    )
+    for _ in range(5):
+        model.tracker.record("primary", 0.01)
+
+    result, elapsed = timed(lambda: asyncio.run(model.ainvoke("hi")))
+
+    assert result.content == "primary-1"
+    assert elapsed < 1.0
@@ -0,0 +1,36 @@
+import asyncio
+
+from app.api import routes
+from app.services.metrics import metrics
+
+
+class SlowAgent:
+    """Stand-in for the agent graph that emits one event, then keeps running."""
+
+    async def astream_events(self, agent_input, config, version):
+        yield {"event": "on_chain_start", "data": {}, "metadata": {}}
+        await asyncio.sleep(3600)
+
+
+def test_closing_stream_at_yield_cancels_run(monkeypatch):
+    events = []
+    open_scope = routes.open_cancellation_scope
+
+    def capture_scope():
+        events.append(open_scope())
+        return events[-1]
+
+    monkeypatch.setattr(routes, "agent_executor", SlowAgent())
+    monkeypatch.setattr(routes, "open_cancellation_scope", capture_scope)
+    before = metrics.snapshot().get("cancellation.runs_cancelled", 0)
+
+    async def consume_then_disconnect():
+        stream = routes.stream_generator({"messages": []})
+        await stream.__anext__()
+        # Starlette closes the generator when the disconnect arrives at `yield`
+        await stream.aclose()
+
+    asyncio.run(consume_then_disconnect())
+
+    assert events[0].is_set()
+    assert metrics.snapshot()["cancellation.runs_cancelled"] == before + 1
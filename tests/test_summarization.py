@@ -0,0 +1,66 @@
+from app.config import settings
+from app.tools import research_tools
+from app.tools.research_tools import IndexedSummary, Summary, SummaryBatch
+
+
+class FakeStructuredModel:
+    """Returns a canned structured answer instead of calling an LLM."""
+
+    def __init__(self, answer):
+        self.answer = answer
+
+    def with_structured_output(self, schema):
+        return self
+
+    def invoke(self, messages):
+        return self.answer
+
+
+def answer(*indices):
+    return SummaryBatch(
+        summaries=[
+            IndexedSummary(index=i, filename=f"page_{i}.md", summary=f"summary {i}")
+            for i in indices
+        ]
+    )
+
+
+def test_batch_summaries_are_matched_by_index(monkeypatch):
+    monkeypatch.setattr(
+        research_tools,
+        "get_summarization_model",
+        lambda: FakeStructuredModel(answer(3, 1, 2)),
+    )
+
+    summaries = research_tools.summarize_webpage_batch(["a", "b", "c"])
+
+    assert [s.filename for s in summaries] == ["page_1.md", "page_2.md", "page_3.md"]
+    assert all(type(s) is Summary for s in summaries)
+
+
+def test_batch_with_duplicate_or_missing_indices_is_rejected(monkeypatch):
+    for indices in [(1, 1, 2), (1, 2), (0, 1, 2)]:
+        monkeypatch.setattr(
+            research_tools,
+            "get_summarization_model",
+            lambda indices=indices: FakeStructuredModel(answer(*indices)),
+        )
+        assert research_tools.summarize_webpage_batch(["a", "b", "c"]) is None
+
+
+def test_rejected_batch_falls_back_to_per_page_calls(monkeypatch):
+    monkeypatch.setattr(
+        research_tools,
+        "get_summarization_model",
+        lambda: FakeStructuredModel(answer(2, 2)),
+    )
+    monkeypatch.setattr(
+        research_tools,
+        "summarize_webpage_content",
+        lambda content: Summary(filename=f"{content}.md", summary=content),
+    )
+    monkeypatch.setattr(settings, "SUMMARIZATION_SMALL_PAGE_TOKENS", 100)
+
+    summaries = research_tools.summarize_webpage_contents(["first", "second"])
+
+    assert [s.filename for s in summaries] == ["first.md", "second.md"]
@@ -0,0 +1,112 @@
+from typing import Annotated, NotRequired
+
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from app.models.state import Todo, todo_reducer
+
+
+def todo(id: str, content: str, status: str = "pending") -> Todo:
+    return {"id": id, "content": content, "status": status}
+
+
+EXISTING = [todo("a1", "search"), todo("b2", "summarize")]
+
+
+def test_list_replaces_todos_and_assigns_missing_ids():
+    todos = todo_reducer(
+        EXISTING,
+        [{"content": "new plan", "status": "pending"}, todo("keep", "kept")],
+    )
+
+    assert [t["content"] for t in todos] == ["new plan", "kept"]
+    assert todos[0]["id"]
+    assert todos[1]["id"] == "keep"
+
+
+def test_none_keeps_existing_todos():
+    assert todo_reducer(EXISTING, None) is EXISTING
+
+
+def test_add_appends_with_ids():
+    todos = todo_reducer(EXISTING, {"add": [{"content": "write", "status": "pending"}]})
+
+    assert [t["content"] for t in todos] == ["search", "summarize", "write"]
+    assert todos[2]["id"] not in {"a1", "b2"}
+
+
+def test_add_to_empty_list():
+    todos = todo_reducer(None, {"add": [todo("c3", "plan")]})
+
+    assert todos == [todo("c3", "plan")]
+
+
+def test_update_changes_only_the_given_fields():
+    todos = todo_reducer(EXISTING, {"update": {"b2": {"status": "completed"}}})
+
+    assert todos == [todo("a1", "search"), todo("b2", "summarize", "completed")]
+    assert EXISTING[1]["status"] == "pending"
+
+
+def test_update_of_unknown_id_is_ignored():
+    assert todo_reducer(EXISTING, {"update": {"zz": {"status": "completed"}}}) == (
+        EXISTING
+    )
+
+
+def test_remove_deletes_by_id():
+    todos = todo_reducer(EXISTING, {"remove": ["a1"]})
+
+    assert todos == [todo("b2", "summarize")]
+
+
+def test_ops_combine_in_one_update():
+    todos = todo_reducer(
+        EXISTING,
+        {
+            "add": [todo("c3", "write")],
+            "update": {"b2": {"status": "in_progress"}},
+            "remove": ["a1"],
+        },
+    )
+
+    assert todos == [todo("b2", "summarize", "in_progress"), todo("c3", "write")]
+
+
+def test_ids_are_preserved_across_updates():
+    todos = todo_reducer(None, [{"content": "search", "status": "pending"}])
+    (todo_id,) = [t["id"] for t in todos]
+
+    todos = todo_reducer(todos, {"add": [{"content": "write", "status": "pending"}]})
+    todos = todo_reducer(todos, {"update": {todo_id: {"status": "completed"}}})
+
+    assert todos[0] == todo(todo_id, "search", "completed")
+    assert todos[1]["id"] != todo_id
+
+
+class TodoState(TypedDict):
+    todos: Annotated[NotRequired[list[Todo]], todo_reducer]
+
+
+def test_parallel_ops_in_one_step_are_merged():
+    def complete_first(state):
+        return {"todos": {"update": {"a1": {"status": "completed"}}}}
+
+    def add_one(state):
+        return {"todos": {"add": [todo("c3", "write")]}}
+
+    def remove_second(state):
+        return {"todos": {"remove": ["b2"]}}
+
+    builder = StateGraph(TodoState)
+    for node in (complete_first, add_one, remove_second):
+        builder.add_node(node)
+        builder.add_edge(START, node.__name__)
+        builder.add_edge(node.__name__, END)
+
+    result = builder.compile().invoke({"todos": EXISTING})
+
+    assert sorted(result["todos"], key=lambda t: t["id"]) == [
+        todo("a1", "search", "completed"),
+        todo("c3", "write"),
+    ]